@@ -16,11 +16,11 @@ import threading
 import queue
 import logging
 from fastapi import APIRouter, WebSocket
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
 from backend.db.session import SessionLocal
 from backend.db import models
 from ml_pipeline.speech_recognition.whisper_listener import listen_and_transcribe, stop_listener
-from ml_pipeline.alignment_module.aligner import match_spoken_to_segment
+from ml_pipeline.alignment_module.aligner import SegmentStore, match_batch
 from starlette.websockets import WebSocketState, WebSocketDisconnect
 
 logger = logging.getLogger(__name__)
@@ -49,6 +49,10 @@ SEMANTIC_ENABLED = False
 BUFFER_MAX_CHUNKS = int(os.getenv("LIVE_BUFFER_CHUNKS", "5"))
 BUFFER_MAX_CHARS = int(os.getenv("LIVE_BUFFER_CHARS", "400"))
 LOOKAHEAD_LIMIT = int(os.getenv("LIVE_LOOKAHEAD_LIMIT", "10"))
+# >0: only score the N simhash-nearest segments of the lookahead window (approximate)
+SIMHASH_TOP_K = int(os.getenv("LIVE_SIMHASH_TOPK", "0"))
+# per-client outbound backlog; a client that falls this far behind is dropped
+SEND_QUEUE_SIZE = int(os.getenv("LIVE_SEND_QUEUE_SIZE", "32"))
 STATIC_THRESHOLD = float(os.getenv("LIVE_INITIAL_THRESHOLD", "0.45"))  # Static threshold
 
 
@@ -81,6 +85,28 @@ def _start_asr_thread_once():
             logger.info("[LIVE] ASR thread spawned.")
 
 
+# ---------------------------------------------------------
+# DB helpers
+# ---------------------------------------------------------
+def _load_live_segments(sermon_id: int):
+    """Return a SegmentStore of the sermon's segments (vetted+translated preferred), or None if no sermon."""
+    with SessionLocal() as db:
+        # one ordered scan; the vetted subset is picked in Python rather than re-queried
+        all_segments = db.query(models.Segment).filter(
+            models.Segment.sermon_id == sermon_id
+        ).order_by(models.Segment.segment_order.asc()).all()
+
+        if not all_segments:
+            exists = db.query(models.Sermon.sermon_id).filter(
+                models.Sermon.sermon_id == sermon_id
+            ).first()
+            return SegmentStore([]) if exists else None
+
+        vetted = [s for s in all_segments if s.is_vetted and s.english_text is not None]
+        # normalize once here (worker thread) instead of on every spoken chunk
+        return SegmentStore(vetted or all_segments)
+
+
 # ---------------------------------------------------------
 # WebSocket helpers
 # ---------------------------------------------------------
@@ -106,6 +132,14 @@ async def _safe_send_json(ws: WebSocket, payload):
         return False
 
 
+async def _send_worker(ws: WebSocket, q: asyncio.Queue):
+    """Drain queued payloads to the socket so alignment never waits on a send."""
+    while True:
+        payload = await q.get()
+        if payload is None or not await _safe_send_json(ws, payload):
+            return
+
+
 # ---------------------------------------------------------
 # Main WebSocket Route
 # ---------------------------------------------------------
@@ -120,38 +154,29 @@ async def live_stream(websocket: WebSocket, sermon_id: int):
         active = _connected_clients
     logger.info(f"[LIVE] client connected — total={active}")
 
-    db: Session = SessionLocal()
-
+    sender = None
     try:
-        sermon = db.query(models.Sermon).filter(
-            models.Sermon.sermon_id == sermon_id
-        ).first()
+        # blocking DB I/O runs off the event loop; the session is closed before streaming
+        store = await run_in_threadpool(_load_live_segments, sermon_id)
 
-        if not sermon:
+        if store is None:
             await websocket.send_text("Sermon not found.")
             await websocket.close()
             return
 
-        segments = db.query(models.Segment).filter(
-            models.Segment.sermon_id == sermon_id,
-            models.Segment.is_vetted == True,
-            models.Segment.english_text != None
-        ).order_by(models.Segment.segment_order.asc()).all()
-
-        if not segments:
-            segments = db.query(models.Segment).filter(
-                models.Segment.sermon_id == sermon_id
-            ).order_by(models.Segment.segment_order.asc()).all()
-
         await _safe_send_json(websocket, {
             "status": "started",
             "sermon_id": sermon_id,
-            "segments_loaded": len(segments),
+            "segments_loaded": len(store),
             "aligner": ALIGNER_MODE
         })
 
         _start_asr_thread_once()
 
+        # subtitle payloads go out through a consumer task, decoupled from matching
+        send_q: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        sender = asyncio.create_task(_send_worker(websocket, send_q))
+
         static_thresh = STATIC_THRESHOLD
         last_matched_order = -1
         asr_buffer_chunks: list[str] = []
@@ -187,19 +212,17 @@ async def live_stream(websocket: WebSocket, sermon_id: int):
                     buffer_text = buffer_text[-BUFFER_MAX_CHARS:]
 
                 # forward-only search
-                segments_to_search = [
-                    s for s in segments if s.segment_order > last_matched_order
-                ]
-                if LOOKAHEAD_LIMIT < len(segments_to_search):
-                    segments_to_search = segments_to_search[:LOOKAHEAD_LIMIT]
-
-                # 1) buffer match
-                best_seg_buf, best_score_buf, best_id_buf, best_order_buf = \
-                    match_spoken_to_segment(buffer_text, segments_to_search, min_score=0.0)
-
-                # 2) single chunk match
-                best_seg_single, best_score_single, best_id_single, best_order_single = \
-                    match_spoken_to_segment(spoken, segments_to_search, min_score=0.0)
+                window = store.window(last_matched_order, LOOKAHEAD_LIMIT)
+
+                # 1) buffer match + 2) single chunk match, scored as one batch
+                # in a worker thread so other clients' loops keep running meanwhile
+                (
+                    (best_seg_buf, best_score_buf, best_id_buf, best_order_buf),
+                    (best_seg_single, best_score_single, best_id_single, best_order_single),
+                ) = await run_in_threadpool(
+                    match_batch, [buffer_text, spoken], store, min_score=0.0,
+                    window=window, top_k=SIMHASH_TOP_K,
+                )
 
                 # pick best
                 if best_score_buf >= best_score_single:
@@ -236,14 +259,13 @@ async def live_stream(websocket: WebSocket, sermon_id: int):
                     skipped = []
                     if chosen_order > last_matched_order + 1:
                         # Find all segments between last matched and current
-                        for seg in segments:
-                            if last_matched_order < seg.segment_order < chosen_order:
-                                skipped.append({
-                                    "segment_id": seg.segment_id,
-                                    "order": seg.segment_order,
-                                    "malay_text": seg.malay_text,
-                                    "english_text": seg.english_text
-                                })
+                        for seg in store.between(last_matched_order, chosen_order):
+                            skipped.append({
+                                "segment_id": seg.segment_id,
+                                "order": seg.segment_order,
+                                "malay_text": seg.malay_text,
+                                "english_text": seg.english_text
+                            })
                         if skipped:
                             logger.info(f"[LIVE] Catching up {len(skipped)} skipped segment(s): orders {[s['order'] for s in skipped]}")
                     
@@ -262,10 +284,16 @@ async def live_stream(websocket: WebSocket, sermon_id: int):
                     logger.info("[LIVE] client disconnected (loop break).")
                     break
 
-                if not await _safe_send_json(websocket, payload):
+                if sender.done():
                     # Send failed, client likely disconnected
                     break
 
+                try:
+                    send_q.put_nowait(payload)
+                except asyncio.QueueFull:
+                    logger.warning("[LIVE] client too slow; dropping connection.")
+                    break
+
             except asyncio.CancelledError:
                 logger.info("[LIVE] send loop cancelled (shutdown).")
                 break
@@ -279,6 +307,9 @@ async def live_stream(websocket: WebSocket, sermon_id: int):
         # -----------------------------------------------------
         # CLEANUP — MULTI-CLIENT SAFE
         # -----------------------------------------------------
+        if sender is not None:
+            sender.cancel()
+
         with _connected_clients_lock:
             if _connected_clients > 0:
                 _connected_clients -= 1
@@ -293,9 +324,6 @@ async def live_stream(websocket: WebSocket, sermon_id: int):
             except Exception as e:
                 logger.warning(f"[LIVE] stop_listener error: {e}")
 
-        # Close database session
-        db.close()
-
 def _get_from_queue_with_timeout():
     """Helper to get from queue with timeout (for use with run_in_executor)."""
     try:
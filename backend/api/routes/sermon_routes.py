@@ -4,19 +4,28 @@ API endpoints for sermon management: upload, list, get sermon and segments.
 """
 
 from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Body, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, update, func, cast, or_, Integer
 from sqlalchemy.orm import Session
+from pydantic import BaseModel
 from pathlib import Path
-from typing import Tuple, List, Optional
-import io, csv, re
+from typing import Tuple, List, Optional, BinaryIO
+import io, csv, re, copy, functools, logging
 
 from backend.db.session import SessionLocal
 from backend.db import models
+from backend.api.utils.translation_batcher import retranslate_batcher
 
 # Optional parsers
 try:
     import docx  # python-docx
 except ImportError:
     docx = None
+try:
+    import pypdfium2 as pdfium  # PDFium engine, preferred for .pdf text extraction
+except ImportError:
+    pdfium = None
 try:
     from PyPDF2 import PdfReader
 except ImportError:
@@ -25,6 +34,29 @@ try:
     from fpdf import FPDF  # pip install fpdf2
 except ImportError:
     FPDF = None
+try:
+    from charset_normalizer import from_bytes  # encoding detection for non-UTF-8 uploads
+except ImportError:
+    from_bytes = None
+try:
+    import pandas as pd  # optional: C CSV engine for large segment uploads
+except ImportError:
+    pd = None
+
+logger = logging.getLogger(__name__)
+
+# ML pipeline (imported once at startup, not inside request handlers).
+# A broken install (e.g. a torch DLL/OSError) only disables these features.
+try:
+    from ml_pipeline.alignment_module.segmenter import segment_text as balanced_segment_text
+except Exception as e:
+    logger.error(f"Segmenter unavailable: {e}")
+    balanced_segment_text = None
+try:
+    from ml_pipeline.translation_model.inference import translate_text_batch
+except Exception as e:
+    logger.error(f"Translation model unavailable: {e}")
+    translate_text_batch = None
 
 router = APIRouter(prefix="/sermon", tags=["sermon"])
 
@@ -37,33 +69,136 @@ def get_db():
 
 ACCEPTED_EXTS = {".txt", ".csv", ".md", ".docx", ".pdf", ".rtf"}
 
-def _safe_decode(raw: bytes) -> str:
-    for enc in ("utf-8", "latin-1"):
+# Hot regexes, compiled once
+_RTF_CTRL_RE = re.compile(r"{\\[^}]+}|\\[A-Za-z]+\d* ?|[{}]")
+_WS_RE = re.compile(r"\s+")
+_SENT_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+_PARA_SPLIT_RE = re.compile(r"\n{2,}")
+
+# PDF export fonts (resolved once, independent of the working directory)
+FONT_DIR = Path(__file__).resolve().parents[2] / "assets" / "fonts"
+PDF_FONTS = {
+    "": FONT_DIR / "DejaVuSans.ttf",
+    "B": FONT_DIR / "DejaVuSans-Bold.ttf",  # bold variant
+}
+
+@functools.lru_cache(maxsize=1)
+def _pdf_fonts_available() -> bool:
+    """Check once per process that the bundled TTF files exist."""
+    return all(path.is_file() for path in PDF_FONTS.values())
+
+def _new_pdf() -> "FPDF":
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=12)
+    return pdf
+
+@functools.lru_cache(maxsize=1)
+def _pdf_template() -> Tuple["FPDF", bool]:
+    """
+    Build the export prototype once: page-break settings plus parsed DejaVu fonts.
+    Returns (template, font_loaded); callers must deepcopy before use.
+    """
+    if _pdf_fonts_available():
+        pdf = _new_pdf()
         try:
-            return raw.decode(enc)
+            for style, path in PDF_FONTS.items():
+                pdf.add_font("DejaVu", style, str(path), uni=True)
+            return pdf, True
         except Exception:
-            continue
-    return raw.decode("utf-8", errors="ignore")
+            pass
+    return _new_pdf(), False
+
+def _split_long_tokens(text: str, max_token: int = 30) -> str:
+    """Normalise whitespace and hard-split unbreakable tokens longer than max_token."""
+    out = []
+    for w in text.split():
+        if len(w) > max_token:
+            out.extend(w[i:i + max_token] for i in range(0, len(w), max_token))
+        else:
+            out.append(w)
+    return " ".join(out)
+
+def _wrap_line(text: str, max_len: int = 90) -> List[str]:
+    """Greedy wrap by slicing at the last space that fits (no per-token concat)."""
+    text = _split_long_tokens(text)
+    parts, i, n = [], 0, len(text)
+    while i < n:
+        if n - i <= max_len:
+            parts.append(text[i:])
+            break
+        cut = text.rfind(" ", i, i + max_len + 1)
+        if cut <= i:
+            # single token longer than max_len: keep it whole on its own line
+            cut = text.find(" ", i)
+            if cut == -1:
+                parts.append(text[i:])
+                break
+        parts.append(text[i:cut])
+        i = cut + 1
+    return parts or [""]
+
+def _safe_decode(raw: bytes) -> str:
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        pass
+    # Not UTF-8: detect once (e.g. cp1252 Malay documents) instead of guessing
+    if from_bytes is not None:
+        best = from_bytes(raw).best()
+        if best is not None:
+            return str(best)
+    return raw.decode("latin-1")
+
+def _read_all(stream: BinaryIO) -> bytes:
+    stream.seek(0)
+    return stream.read()
+
+def _extract_pdf_text_pdfium(stream: BinaryIO) -> str:
+    stream.seek(0)
+    doc = pdfium.PdfDocument(stream)
+    try:
+        pages = []
+        for page in doc:
+            try:
+                textpage = page.get_textpage()
+                pages.append(textpage.get_text_range() or "")
+                textpage.close()
+            except Exception:
+                continue
+            finally:
+                page.close()
+        return "\n".join(pages).strip()
+    finally:
+        doc.close()
 
-def _extract_text(upload: UploadFile, raw: bytes) -> Tuple[str, bool, str]:
+def _extract_text(upload: UploadFile) -> Tuple[str, bool, str]:
+    """Parse upload.file (Starlette's SpooledTemporaryFile) in place; docx/pdf never copy it."""
+    stream = upload.file
     ext = Path(upload.filename or "").suffix.lower()
     if ext not in ACCEPTED_EXTS:
         raise HTTPException(status_code=400, detail=f"Unsupported file type: {ext}")
 
     if ext == ".csv":
-        return _safe_decode(raw), True, ext
+        return _safe_decode(_read_all(stream)), True, ext
     if ext in {".txt", ".md"}:
-        return _safe_decode(raw), False, ext
+        return _safe_decode(_read_all(stream)), False, ext
     if ext == ".docx":
         if not docx:
             raise HTTPException(status_code=500, detail="python-docx not installed")
-        d = docx.Document(io.BytesIO(raw))
+        stream.seek(0)
+        d = docx.Document(stream)
         text = "\n".join(p.text for p in d.paragraphs if p.text and p.text.strip())
         return text.strip(), False, ext
     if ext == ".pdf":
+        if pdfium is not None:
+            try:
+                return _extract_pdf_text_pdfium(stream), False, ext
+            except Exception:
+                pass  # unreadable by PDFium: try PyPDF2 below
         if not PdfReader:
-            raise HTTPException(status_code=500, detail="PyPDF2 not installed")
-        reader = PdfReader(io.BytesIO(raw))
+            raise HTTPException(status_code=500, detail="No PDF parser installed (pypdfium2 or PyPDF2)")
+        stream.seek(0)
+        reader = PdfReader(stream)
         pages = []
         for page in reader.pages:
             try:
@@ -72,11 +207,71 @@ def _extract_text(upload: UploadFile, raw: bytes) -> Tuple[str, bool, str]:
                 continue
         return "\n".join(pages).strip(), False, ext
     if ext == ".rtf":
-        raw_text = _safe_decode(raw)
-        cleaned = re.sub(r"{\\[^}]+}|\\[A-Za-z]+\d* ?|[{}]", " ", raw_text)
-        cleaned = re.sub(r"\s+", " ", cleaned)
+        raw_text = _safe_decode(_read_all(stream))
+        cleaned = _RTF_CTRL_RE.sub(" ", raw_text)
+        cleaned = _WS_RE.sub(" ", cleaned)
         return cleaned.strip(), False, ext
-    return _safe_decode(raw), False, ext
+    return _safe_decode(_read_all(stream)), False, ext
+
+def _parse_segment_csv(text_data: str) -> List[Tuple[int, str]]:
+    """Return (order, malay_text) pairs from an uploaded CSV, skipping invalid/blank rows."""
+    if pd is not None:
+        try:
+            df = pd.read_csv(io.StringIO(text_data), header=None, usecols=[0, 1], dtype=str,
+                             keep_default_na=False, skip_blank_lines=True, on_bad_lines="skip")
+            # only integer-looking orders, exactly what int() accepts in the fallback
+            # ("4.0" / "1e0" are rejected on both paths)
+            is_int = df[0].str.fullmatch(r"\s*[+-]?\d+\s*")
+            malay = df[1].str.strip()
+            keep = is_int & (malay != "")
+            return list(zip(df[0][keep].map(int).tolist(), malay[keep].tolist()))
+        except Exception:
+            pass  # malformed/one-column file: fall back to the row-by-row parser
+
+    # csv.reader already yields lists of str: no str() wrapping, only ValueError to catch
+    pairs = []
+    append = pairs.append
+    for row in csv.reader(io.StringIO(text_data)):
+        if len(row) < 2:
+            continue
+        try:
+            order = int(row[0])  # int() tolerates surrounding whitespace
+        except ValueError:
+            continue
+        malay_text = row[1].strip()
+        if malay_text:
+            append((order, malay_text))
+    return pairs
+
+def _split_sentences(t: str) -> List[str]:
+    return [s.strip() for s in _SENT_SPLIT_RE.split(t) if s.strip()]
+
+@functools.lru_cache(maxsize=32)
+def _split_raw_text(raw: str, strategy: str = "auto") -> Tuple[str, ...]:
+    """
+    Split raw sermon text by strategy (auto|sentence|paragraph).
+    Memoized on the text itself, so re-segmenting unchanged text is free and
+    edits to raw_text can never hit a stale entry.
+    """
+    if strategy == "sentence":
+        parts = _split_sentences(raw)
+    elif strategy == "paragraph":
+        parts = [p.strip() for p in _PARA_SPLIT_RE.split(raw) if p.strip()]
+    else:
+        # auto/balanced
+        try:
+            if balanced_segment_text is None:
+                raise RuntimeError("segmenter unavailable")
+            parts = balanced_segment_text(raw)
+        except Exception:
+            parts = _split_sentences(raw)
+    return tuple(parts)
+
+def _bulk_insert_segments(db: Session, rows: List[dict]) -> int:
+    """Insert segment mappings as one executemany (insertmanyvalues) batch; caller commits."""
+    if rows:
+        db.execute(insert(models.Segment), rows)
+    return len(rows)
 
 # Upload
 @router.post("/upload")
@@ -87,92 +282,99 @@ async def upload_sermon(
     auto_segment: bool = Form(False),
     db: Session = Depends(get_db)
 ):
+    # Parsing (PDF/DOCX/RTF) is CPU-bound; keep it off the event loop.
+    # Reads straight from Starlette's spooled upload file, no extra in-memory copy.
+    text_data, is_csv, ext = await run_in_threadpool(_extract_text, file)
+
+    # One transaction for the sermon and its segments: flush() assigns sermon_id,
+    # a single commit at the end (a failed parse no longer leaves an empty sermon)
     sermon = models.Sermon(title=title, speaker=speaker, status="uploaded_raw")
     db.add(sermon)
-    db.commit()
-    db.refresh(sermon)
-
-    raw = await file.read()
-    text_data, is_csv, ext = _extract_text(file, raw)
+    db.flush()
 
     inserted = 0
     if is_csv:
-        reader = csv.reader(io.StringIO(text_data))
-        for row in reader:
-            if not row or len(row) < 2:
-                continue
-            try:
-                order = int(str(row[0]).strip())
-            except Exception:
-                continue
-            malay_text = str(row[1]).strip()
-            if not malay_text:
-                continue
-            seg = models.Segment(sermon_id=sermon.sermon_id, segment_order=order, malay_text=malay_text)
-            db.add(seg)
-            inserted += 1
+        pairs = await run_in_threadpool(_parse_segment_csv, text_data)
+        inserted = _bulk_insert_segments(db, [
+            {"sermon_id": sermon.sermon_id, "segment_order": order, "malay_text": malay_text}
+            for order, malay_text in pairs
+        ])
         sermon.status = "segments_uploaded"
-        db.commit()
     else:
         # store raw_text
         if hasattr(sermon, "raw_text"):
             sermon.raw_text = text_data
         if auto_segment:
             # use balanced segmenter
-            from ml_pipeline.alignment_module.segmenter import segment_text as balanced_segment_text  # if exists
-            try:
-                segs = balanced_segment_text(text_data)
-            except Exception:
-                segs = [s for s in re.split(r"(?<=[.!?])\s+", text_data) if s.strip()]
-            for idx, seg in enumerate(segs, start=1):
-                db.add(models.Segment(sermon_id=sermon.sermon_id, segment_order=idx, malay_text=seg.strip()))
-                inserted += 1
+            segs = await run_in_threadpool(_split_raw_text, text_data, "auto")
+            inserted = _bulk_insert_segments(db, [
+                {"sermon_id": sermon.sermon_id, "segment_order": idx, "malay_text": seg.strip()}
+                for idx, seg in enumerate(segs, start=1)
+            ])
             sermon.status = "segmented"
         else:
             sermon.status = "uploaded_raw"
-        db.commit()
 
-    return {
+    result = {
         "sermon_id": sermon.sermon_id,
         "inserted_segments": inserted,
         "status": sermon.status,
         "source_ext": ext,
     }
+    db.commit()
+    return result
 
 # List sermons (for dropdown)
 @router.get("/list")
-def list_sermons(db: Session = Depends(get_db)):
-    rows = db.query(models.Sermon).order_by(models.Sermon.sermon_id.desc()).all()
+def list_sermons(limit: Optional[int] = None, offset: int = 0, db: Session = Depends(get_db)):
+    # Only the listed columns (never raw_text); optional limit/offset paging
+    q = db.query(
+        models.Sermon.sermon_id,
+        models.Sermon.title,
+        models.Sermon.speaker,
+        models.Sermon.status,
+    ).order_by(models.Sermon.sermon_id.desc())
+    if offset > 0:
+        q = q.offset(offset)
+    if limit is not None:
+        q = q.limit(max(1, limit))
     return [
         {
-            "sermon_id": s.sermon_id,
-            "title": s.title,
-            "speaker": s.speaker,
-            "status": s.status,
-        } for s in rows
+            "sermon_id": sermon_id,
+            "title": title,
+            "speaker": speaker,
+            "status": status,
+        } for sermon_id, title, speaker, status in q.all()
     ]
 
 # Get segments for a sermon
 @router.get("/{sermon_id}/segments")
 def get_segments(sermon_id: int, db: Session = Depends(get_db)):
-    segs = db.query(models.Segment)\
-        .filter(models.Segment.sermon_id == sermon_id)\
+    # Column tuples only: no ORM instance hydration for large sermons
+    rows = db.query(
+        models.Segment.segment_id,
+        models.Segment.segment_order,
+        models.Segment.malay_text,
+        models.Segment.english_text,
+        models.Segment.confidence_score,
+        models.Segment.is_vetted,
+    ).filter(models.Segment.sermon_id == sermon_id)\
         .order_by(models.Segment.segment_order.asc()).all()
     return [
         {
-            "segment_id": x.segment_id,
-            "segment_order": x.segment_order,
-            "malay_text": x.malay_text,
-            "english_text": x.english_text,
-            "confidence": x.confidence_score,
-            "vetted": x.is_vetted,
-        } for x in segs
+            "segment_id": segment_id,
+            "segment_order": segment_order,
+            "malay_text": malay_text,
+            "english_text": english_text,
+            "confidence": confidence,
+            "vetted": vetted,
+        } for segment_id, segment_order, malay_text, english_text, confidence, vetted in rows
     ]
 
 # Patch segment (edit english/vetted)
 @router.patch("/segment/{segment_id}")
-def patch_segment(segment_id: int, payload: dict = Body(...), db: Session = Depends(get_db)):
-    seg = db.query(models.Segment).filter(models.Segment.segment_id == segment_id).first()
+async def patch_segment(segment_id: int, payload: dict = Body(...), db: Session = Depends(get_db)):
+    seg = db.get(models.Segment, segment_id)
     if not seg:
         raise HTTPException(404, "Segment not found")
 
@@ -181,25 +383,44 @@ def patch_segment(segment_id: int, payload: dict = Body(...), db: Session = Depe
     vetted = payload.get("vetted")
     retranslate = payload.get("retranslate", False)
 
+    # Collect the edits first; nothing is written until the translation (if any) is back
+    updates = {}
     changed_malay = False
-    if malay_text is not None and malay_text.strip() != (seg.malay_text or "").strip():
-        seg.malay_text = malay_text.strip()
-        changed_malay = True
+    if malay_text is not None:
+        new_hash = models.text_digest(malay_text)
+        if new_hash != (seg.malay_hash or models.text_digest(seg.malay_text)):
+            updates["malay_text"] = malay_text.strip()
+            updates["malay_hash"] = new_hash
+            changed_malay = True
+        elif seg.english_text:
+            # Redundant save of unchanged Malay text: keep the existing translation
+            retranslate = False
 
     if english_text is not None:
-        seg.english_text = english_text
+        updates["english_text"] = english_text
 
     if vetted is not None:
-        seg.is_vetted = bool(vetted)
+        updates["is_vetted"] = bool(vetted)
 
     # On demand retranslation (if malay changed or explicit flag)
     if retranslate or (changed_malay and english_text is None):
-        from ml_pipeline.translation_model.inference import translate_text_batch
-        result = translate_text_batch([seg.malay_text])[0]
-        seg.english_text = result["text"]
+        if translate_text_batch is None:
+            raise HTTPException(503, "Translation model not available")
+        source = updates.get("malay_text", seg.malay_text)
+        # Hand the connection back to the pool while the batch window and model run
+        db.rollback()
+        # Coalesced with concurrent edits into one batched model call;
+        # an explicit retranslate asks for a fresh result, so it bypasses the cache
+        result = await retranslate_batcher.submit(source, not retranslate)
+        updates["english_text"] = result["text"]
         if "confidence" in result:
-            seg.confidence = float(result["confidence"])
+            updates["confidence_score"] = float(result["confidence"])
+        seg = db.get(models.Segment, segment_id)
+        if not seg:
+            raise HTTPException(404, "Segment not found")
 
+    for key, value in updates.items():
+        setattr(seg, key, value)
     db.commit()
     db.refresh(seg)
     return {
@@ -212,36 +433,73 @@ def patch_segment(segment_id: int, payload: dict = Body(...), db: Session = Depe
         "retranslated": retranslate or changed_malay
     }
 
+class SegmentVetItem(BaseModel):
+    segment_id: int
+    english_text: Optional[str] = None
+    vetted: bool = True
+
+class SegmentVetRequest(BaseModel):
+    segments: List[SegmentVetItem] = []
+
+# Bulk vet segments (one IN query + one grouped count, not per-segment round trips)
+# Malformed payloads are rejected with 422 by the request model.
+@router.post("/segments/vet")
+def vet_segments_bulk(payload: SegmentVetRequest, db: Session = Depends(get_db)):
+    items = {it.segment_id: it for it in payload.segments}
+    if not items:
+        return {"ok": True, "updated": 0, "missing": [], "sermons_vetted": []}
+
+    segs = db.query(models.Segment).filter(models.Segment.segment_id.in_(list(items))).all()
+    touched = set()
+    for seg in segs:
+        it = items[seg.segment_id]
+        if it.english_text is not None:
+            seg.english_text = it.english_text
+        seg.is_vetted = it.vetted
+        touched.add(seg.sermon_id)
+    db.flush()
+
+    # Sermons whose segments are now all vetted
+    sermons_vetted = []
+    if touched:
+        unvetted = dict(
+            db.query(models.Segment.sermon_id, func.count())
+            .filter(models.Segment.sermon_id.in_(touched), models.Segment.is_vetted.isnot(True))
+            .group_by(models.Segment.sermon_id)
+            .all()
+        )
+        sermons_vetted = sorted(touched - unvetted.keys())
+        if sermons_vetted:
+            db.query(models.Sermon)\
+                .filter(models.Sermon.sermon_id.in_(sermons_vetted))\
+                .update({"status": "vetted"}, synchronize_session=False)
+    db.commit()
+    return {
+        "ok": True,
+        "updated": len(segs),
+        "missing": sorted(set(items) - {s.segment_id for s in segs}),
+        "sermons_vetted": sermons_vetted,
+    }
+
 # Segment-now (strategy: auto|sentence|paragraph)
 @router.post("/{sermon_id}/segment-now")
 def segment_now(sermon_id: int, strategy: str = "auto", db: Session = Depends(get_db)):
-    sermon = db.query(models.Sermon).filter(models.Sermon.sermon_id == sermon_id).first()
+    sermon = db.get(models.Sermon, sermon_id)
     if not sermon:
         raise HTTPException(404, "Sermon not found")
     raw = getattr(sermon, "raw_text", None)
     if not raw:
         raise HTTPException(400, "No raw_text on sermon")
 
-    # Clear old segments
-    db.query(models.Segment).filter(models.Segment.sermon_id == sermon_id).delete()
-
-    def split_sentences(t: str):
-        return [s.strip() for s in re.split(r"(?<=[.!?])\s+", t) if s.strip()]
+    parts = _split_raw_text(raw, strategy)
 
-    if strategy == "sentence":
-        parts = split_sentences(raw)
-    elif strategy == "paragraph":
-        parts = [p.strip() for p in re.split(r"\n{2,}", raw) if p.strip()]
-    else:
-        # auto/balanced
-        try:
-            from ml_pipeline.alignment_module.segmenter import segment_text
-            parts = segment_text(raw)
-        except Exception:
-            parts = split_sentences(raw)
-
-    for i, p in enumerate(parts, start=1):
-        db.add(models.Segment(sermon_id=sermon_id, segment_order=i, malay_text=p))
+    # Replace old segments in one transaction: bulk DELETE (no session scan) + batched INSERT
+    db.query(models.Segment).filter(models.Segment.sermon_id == sermon_id)\
+        .delete(synchronize_session=False)
+    _bulk_insert_segments(db, [
+        {"sermon_id": sermon_id, "segment_order": i, "malay_text": p}
+        for i, p in enumerate(parts, start=1)
+    ])
     sermon.status = "segmented"
     db.commit()
     return {"ok": True, "count": len(parts)}
@@ -257,28 +515,29 @@ def translate_all(
     model_name = (payload or {}).get("model_name")
     only_empty = (payload or {}).get("only_empty", False)
 
-    segs = db.query(models.Segment)\
-        .filter(models.Segment.sermon_id == sermon_id)\
-        .order_by(models.Segment.segment_order.asc()).all()
-
-    targets = []
-    target_segments = []
-    for s in segs:
-        if only_empty and getattr(s, "english_text", None):
-            continue
-        targets.append(s.malay_text or "")
-        target_segments.append(s)
+    # Let the DB return only the rows that need work (and only the columns we use)
+    q = db.query(models.Segment.segment_id, models.Segment.malay_text)\
+        .filter(models.Segment.sermon_id == sermon_id)
+    if only_empty:
+        q = q.filter(or_(models.Segment.english_text.is_(None), models.Segment.english_text == ""))
+    target_segments = q.order_by(models.Segment.segment_order.asc()).all()
+    targets = [s.malay_text or "" for s in target_segments]
 
     if not targets:
         return {"ok": True, "count": 0, "provider": provider, "skipped": True}
 
-    from ml_pipeline.translation_model.inference import translate_text_batch
+    if translate_text_batch is None:
+        raise HTTPException(503, "Translation model not available")
     results = translate_text_batch(targets, provider=provider)  # Pass provider
 
+    # One executemany UPDATE keyed by primary key instead of a flush per dirty object
+    mappings = []
     for s, r in zip(target_segments, results):
-        s.english_text = r["text"]
+        m = {"segment_id": s.segment_id, "english_text": r["text"]}
         if "confidence" in r:
-            s.confidence = float(r["confidence"])
+            m["confidence_score"] = float(r["confidence"])
+        mappings.append(m)
+    db.execute(update(models.Segment), mappings)
     db.commit()
     return {
         "ok": True,
@@ -291,10 +550,11 @@ def translate_all(
 # Delete a sermon and its segments
 @router.delete("/{sermon_id}")
 def delete_sermon(sermon_id: int, db: Session = Depends(get_db)):
-    sermon = db.query(models.Sermon).filter(models.Sermon.sermon_id == sermon_id).first()
+    sermon = db.get(models.Sermon, sermon_id)
     if not sermon:
         raise HTTPException(404, "Sermon not found")
-    db.query(models.Segment).filter(models.Segment.sermon_id == sermon_id).delete()
+    db.query(models.Segment).filter(models.Segment.sermon_id == sermon_id)\
+        .delete(synchronize_session=False)
     db.delete(sermon)
     db.commit()
     return {"ok": True, "deleted_sermon_id": sermon_id}
@@ -302,24 +562,41 @@ def delete_sermon(sermon_id: int, db: Session = Depends(get_db)):
 # Export sermon segments to file (CSV, TXT, PDF)
 @router.get("/{sermon_id}/export")
 def export_sermon(sermon_id: int, format: str = "csv", db: Session = Depends(get_db)):
-    sermon = db.query(models.Sermon).filter(models.Sermon.sermon_id == sermon_id).first()
+    sermon = db.get(models.Sermon, sermon_id)
     if not sermon:
         raise HTTPException(404, "Sermon not found")
-    segs = db.query(models.Segment).filter(models.Segment.sermon_id == sermon_id)\
-        .order_by(models.Segment.segment_order.asc()).all()
-
-    def csv_escape(val: str) -> str:
-        val = (val or "").replace('"', '""')
-        return f'"{val}"'
+    segs_q = db.query(models.Segment).filter(models.Segment.sermon_id == sermon_id)\
+        .order_by(models.Segment.segment_order.asc())
 
     if format == "csv":
-        buf = io.StringIO()
-        buf.write("segment_order,malay_text,english_text,confidence,vetted\n")
-        for s in segs:
-            buf.write(f"{s.segment_order},{csv_escape(s.malay_text)},{csv_escape(s.english_text)},{getattr(s,'confidence','')},{int(getattr(s,'vetted', False))}\n")
-        data = buf.getvalue().encode("utf-8")
-        return Response(data, media_type="text/csv",
-                        headers={"Content-Disposition": f"attachment; filename=sermon_{sermon_id}.csv"})
+        # Stream rows straight from the DB cursor (constant memory, early first byte)
+        # Plain column tuples shaped for the CSV in SQL (vetted as 0/1), so each
+        # cursor partition goes straight into the C writer via writerows()
+        rows_stmt = segs_q.with_entities(
+            models.Segment.segment_order,
+            models.Segment.malay_text,
+            models.Segment.english_text,
+            models.Segment.confidence_score,
+            func.coalesce(cast(models.Segment.is_vetted, Integer), 0),
+        ).statement
+
+        def csv_rows(chunk_rows: int = 500):
+            buf = io.StringIO()
+            writer = csv.writer(buf, lineterminator="\n")
+            writer.writerow(["segment_order", "malay_text", "english_text", "confidence", "vetted"])
+            result = db.execute(rows_stmt, execution_options={"yield_per": chunk_rows})
+            for part in result.partitions():
+                writer.writerows(part)
+                yield buf.getvalue().encode("utf-8")
+                buf.seek(0)
+                buf.truncate(0)
+            if buf.tell():
+                yield buf.getvalue().encode("utf-8")
+        return StreamingResponse(csv_rows(), media_type="text/csv",
+                                 headers={"Content-Disposition": f"attachment; filename=sermon_{sermon_id}.csv"})
+
+    # txt/pdf write rows as they stream from the cursor (ordered by the composite index)
+    segs = segs_q.yield_per(500)
 
     if format == "txt":
         lines = [f"# {sermon.title or ''}",
@@ -336,18 +613,11 @@ def export_sermon(sermon_id: int, format: str = "csv", db: Session = Depends(get
     if format == "pdf":
         if FPDF is None:
             raise HTTPException(500, "fpdf2 not installed (pip install fpdf2)")
-        pdf = FPDF()
-        pdf.set_auto_page_break(auto=True, margin=12)
+        # Copy the prototype instead of re-parsing the TTF fonts per export
+        template, font_loaded = _pdf_template()
+        pdf = copy.deepcopy(template)
         pdf.add_page()
-
-        font_loaded = False
-        try:
-            pdf.add_font("DejaVu", "", "backend/assets/fonts/DejaVuSans.ttf", uni=True)
-            pdf.add_font("DejaVu", "B", "backend/assets/fonts/DejaVuSans-Bold.ttf", uni=True)  # bold variant
-            pdf.set_font("DejaVu", "B", 14)
-            font_loaded = True
-        except Exception:
-            pdf.set_font("Arial", "B", 14)
+        pdf.set_font("DejaVu" if font_loaded else "Arial", "B", 14)
 
         pdf.cell(0, 10, sermon.title or "", ln=1)
         pdf.set_font("DejaVu" if font_loaded else "Arial", "", 11)
@@ -357,38 +627,13 @@ def export_sermon(sermon_id: int, format: str = "csv", db: Session = Depends(get
 
         line_width = pdf.w - pdf.l_margin - pdf.r_margin
 
-        def split_long_tokens(text: str, max_token: int = 30):
-            out = []
-            for w in text.split():
-                if len(w) > max_token:
-                    # hard split very long unbreakable token
-                    for i in range(0, len(w), max_token):
-                        out.append(w[i:i+max_token])
-                else:
-                    out.append(w)
-            return " ".join(out)
-
-        def wrap_line(text: str, max_len: int = 90):
-            text = split_long_tokens(text)
-            parts, buf = [], ""
-            for tok in text.split():
-                if len(buf) + 1 + len(tok) <= max_len:
-                    buf = f"{buf} {tok}".strip()
-                else:
-                    if buf:
-                        parts.append(buf)
-                    buf = tok
-            if buf:
-                parts.append(buf)
-            return parts or [""]
-
         for s in segs:
             pdf.set_font("DejaVu" if font_loaded else "Arial", "B", 10)
-            for ln in wrap_line(f"{s.segment_order}. {s.malay_text}", 90):
+            for ln in _wrap_line(f"{s.segment_order}. {s.malay_text}", 90):
                 pdf.multi_cell(line_width, 5, ln)
             if s.english_text:
                 pdf.set_font("DejaVu" if font_loaded else "Arial", "", 10)
-                for ln in wrap_line(f"EN: {s.english_text}", 90):
+                for ln in _wrap_line(f"EN: {s.english_text}", 90):
                     pdf.multi_cell(line_width, 5, ln)
             pdf.ln(2)
 
@@ -415,20 +660,19 @@ def export_sermon(sermon_id: int, format: str = "csv", db: Session = Depends(get
 @router.get("/dashboard/stats")
 def get_dashboard_stats(db: Session = Depends(get_db)):
     """Get dashboard statistics for React frontend."""
-    total_sermons = db.query(models.Sermon).count()
-    
-    # Count segments
-    total_segments = db.query(models.Segment).count()
-    vetted_segments = db.query(models.Segment).filter(models.Segment.is_vetted).count()
-    
-    # Count sermons by status
-    pending_review = db.query(models.Sermon).filter(
-        models.Sermon.status.in_(['translated', 'segmented'])
-    ).count()
-    
-    vetted_ready = db.query(models.Sermon).filter(
-        models.Sermon.status == 'vetted'
-    ).count()
+    # Count sermons by status (one grouped query)
+    by_status = dict(
+        db.query(models.Sermon.status, func.count()).group_by(models.Sermon.status).all()
+    )
+    total_sermons = sum(by_status.values())
+    pending_review = by_status.get('translated', 0) + by_status.get('segmented', 0)
+    vetted_ready = by_status.get('vetted', 0)
+
+    # Count segments (total and vetted in one pass)
+    total_segments, vetted_segments = db.query(
+        func.count(),
+        func.count().filter(models.Segment.is_vetted.is_(True)),
+    ).select_from(models.Segment).one()
     
     return {
         "total_sermons": total_sermons,
@@ -442,7 +686,7 @@ def get_dashboard_stats(db: Session = Depends(get_db)):
 @router.get("/{sermon_id}")
 def get_sermon(sermon_id: int, db: Session = Depends(get_db)):
     """Get a single sermon by ID."""
-    sermon = db.query(models.Sermon).filter(models.Sermon.sermon_id == sermon_id).first()
+    sermon = db.get(models.Sermon, sermon_id)
     if not sermon:
         raise HTTPException(404, "Sermon not found")
     return {
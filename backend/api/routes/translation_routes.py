@@ -12,6 +12,7 @@ from typing import List
 from datetime import datetime  # added this
 
 from fastapi import APIRouter, Form, Depends, HTTPException
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from backend.db.session import SessionLocal
@@ -53,11 +54,11 @@ def translate_start(sermon_id: int = Form(...), db: Session = Depends(get_db)):
     # Call translation inference (stubbed model or API)
     translations = translate_text_batch(malay_texts)  # [{'text':..., 'confidence':...}]
 
-    # Update database records
-    for s, t in zip(segments, translations):
-        s.english_text = t["text"]
-        s.confidence_score = t["confidence"]
-
+    # Update database records (single executemany UPDATE keyed by segment_id)
+    db.execute(update(models.Segment), [
+        {"segment_id": s.segment_id, "english_text": t["text"], "confidence_score": t["confidence"]}
+        for s, t in zip(segments, translations)
+    ])
     db.commit()
     logger.info(f"Translation completed for sermon_id={sermon_id} ({len(translations)} segments).")
 
@@ -82,7 +83,7 @@ def vet_segment(
     Human vetting: reviewer provides corrected/approved English text for a segment.
     Updates `is_vetted`, `english_text`, and reviewer info.
     """
-    seg = db.query(models.Segment).filter(models.Segment.segment_id == segment_id).first()
+    seg = db.get(models.Segment, segment_id)
     if not seg:
         raise HTTPException(status_code=404, detail="Segment not found.")
 
@@ -1,31 +1,128 @@
 import asyncio
+import json
+import os
+import zlib
+from typing import Optional
 from fastapi import WebSocket
 import logging
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Per-client outbound backlog; a client that falls this far behind is dropped.
+CLIENT_QUEUE_SIZE = int(os.getenv("WS_CLIENT_QUEUE_SIZE", "32"))
+# Payloads at least this large are zlib-compressed once and sent as binary
+# frames (decode client-side with DecompressionStream("deflate")). 0 = off.
+COMPRESS_MIN_BYTES = int(os.getenv("WS_BROADCAST_COMPRESS_MIN", "0"))
+COMPRESS_LEVEL = int(os.getenv("WS_BROADCAST_COMPRESS_LEVEL", "6"))
+# Opt-in: messages broadcast within this window go out as one {"batch": [...]}
+# frame, which clients must unpack. 0 (default) = off, one frame per message.
+COALESCE_MS = float(os.getenv("WS_BROADCAST_COALESCE_MS", "0"))
+
+
+def _dumps(message: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(message).decode()
+    return json.dumps(message)
+
+
 class BroadcastManager:
-    def __init__(self):
-        self.active_connections: set[WebSocket] = set()
-        self.lock = asyncio.Lock()
+    def __init__(
+        self,
+        queue_size: int = CLIENT_QUEUE_SIZE,
+        compress_min: int = COMPRESS_MIN_BYTES,
+        coalesce_ms: float = COALESCE_MS,
+    ):
+        # each client gets its own bounded queue drained by a writer task,
+        # so a slow socket never stalls the broadcaster or other clients
+        # keyed by id(ws): O(1) add/remove without touching WebSocket __hash__/__eq__
+        self.clients: dict[int, WebSocket] = {}
+        self._queues: dict[int, asyncio.Queue] = {}
+        self._writers: dict[int, asyncio.Task] = {}
+        self.queue_size = queue_size
+        self.compress_min = compress_min
+        self.coalesce = coalesce_ms / 1000.0
+        self._pending: list[dict] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.add(websocket)
-        logger.info(f"WS connected. Clients={len(self.active_connections)}")
+        q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        key = id(websocket)
+        self.clients[key] = websocket
+        self._queues[key] = q
+        self._writers[key] = asyncio.create_task(self._writer(websocket, q))
+        logger.info(f"WS connected. Clients={len(self.clients)}")
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-            logger.info(f"WS disconnected. Clients={len(self.active_connections)}")
+        self._drop(id(websocket))
+
+    def _drop(self, key: int):
+        if self.clients.pop(key, None) is not None:
+            self._queues.pop(key, None)
+            task = self._writers.pop(key, None)
+            if task is not None and task is not asyncio.current_task():
+                task.cancel()
+            logger.info(f"WS disconnected. Clients={len(self.clients)}")
+
+    async def _writer(self, websocket: WebSocket, q: asyncio.Queue):
+        try:
+            while True:
+                msg = await q.get()
+                if isinstance(msg, bytes):
+                    await websocket.send_bytes(msg)
+                else:
+                    await websocket.send_text(msg)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"WS send failed: {e}")
+        finally:
+            self.disconnect(websocket)
+
+    def has_subscribers(self) -> bool:
+        """False when nobody can receive a broadcast; producers can skip building the message."""
+        return bool(self.clients)
 
     async def broadcast_json(self, message: dict):
+        """Queue a message; bursts within the coalesce window share one frame."""
+        if not self.has_subscribers():
+            return
+        if not self.coalesce:
+            self._fan_out(_dumps(message))
+            return
+        self._pending.append(message)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.coalesce, self._flush)
+
+    async def broadcast_json_immediate(self, message: dict):
+        """Send now, bypassing the coalesce window (may overtake pending messages)."""
+        if not self.has_subscribers():
+            return
+        self._fan_out(_dumps(message))
+
+    def _flush(self):
+        self._flush_handle = None
+        buf, self._pending = self._pending, []
+        if not buf:
+            return
+        # a lone message keeps its original shape
+        self._fan_out(_dumps(buf[0] if len(buf) == 1 else {"batch": buf}))
+
+    def _fan_out(self, payload: str):
+        # encode once; every client queue shares the same payload
+        if self.compress_min and self.clients and len(payload) >= self.compress_min:
+            # one deflate pass shared by all clients instead of per-socket compression
+            payload = zlib.compress(payload.encode(), COMPRESS_LEVEL)
         dead = []
-        async with self.lock:
-            for ws in self.active_connections:
-                try:
-                    await ws.send_json(message)
-                except Exception as e:
-                    logger.error(f"WS send failed: {e}")
-                    dead.append(ws)
-        for ws in dead:
-            self.disconnect(ws)
\ No newline at end of file
+        for key, q in list(self._queues.items()):
+            try:
+                q.put_nowait(payload)
+            except asyncio.QueueFull:
+                logger.warning("WS client too slow; dropping connection.")
+                dead.append(key)
+        for key in dead:
+            self._drop(key)
@@ -4,32 +4,68 @@
 Helper functions for simple DB operations used by the API routes.
 """
 
+from sqlalchemy import insert, lambda_stmt, select
 from sqlalchemy.orm import Session
 from backend.db import models
-from typing import List
+from typing import List, Dict
 
-def create_sermon(db: Session, title: str, speaker: str = None):
-    new = models.Sermon(title=title, speaker=speaker)
-    db.add(new)
+def _insert_and_commit(db: Session, model, **values):
+    """
+    INSERT one row and commit, returning the persistent ORM object.
+    INSERT ... RETURNING loads the PK and server defaults in the same round
+    trip, so no follow-up refresh SELECT is issued.
+    """
+    obj = db.execute(insert(model).values(**values).returning(model)).scalar_one()
     db.commit()
-    db.refresh(new)
-    return new
+    return obj
+
+def create_sermon(db: Session, title: str, speaker: str = None):
+    return _insert_and_commit(db, models.Sermon, title=title, speaker=speaker)
 
 def get_sermon(db: Session, sermon_id: int):
-    return db.query(models.Sermon).filter(models.Sermon.sermon_id == sermon_id).first()
+    return db.get(models.Sermon, sermon_id)
 
 def create_segment(db: Session, sermon_id: int, order: int, malay_text: str, english_text: str = None, confidence: float = None):
-    seg = models.Segment(
+    return _insert_and_commit(
+        db,
+        models.Segment,
         sermon_id=sermon_id,
         segment_order=order,
         malay_text=malay_text,
         english_text=english_text,
         confidence_score=confidence
     )
-    db.add(seg)
+
+def create_segments_bulk(db: Session, sermon_id: int, segments: List[Dict], start_order: int = 1) -> List[int]:
+    """
+    Insert many segments in one batched INSERT ... RETURNING and a single commit.
+    Each item needs "malay_text"; "english_text" and "confidence" are optional.
+    Returns the new segment_ids in input order.
+    """
+    if not segments:
+        return []
+    rows = [
+        {
+            "sermon_id": sermon_id,
+            "segment_order": start_order + i,
+            "malay_text": s["malay_text"],
+            "english_text": s.get("english_text"),
+            "confidence_score": s.get("confidence"),
+        }
+        for i, s in enumerate(segments)
+    ]
+    ids = db.execute(
+        insert(models.Segment).returning(models.Segment.segment_id, sort_by_parameter_order=True),
+        rows,
+    ).scalars().all()
     db.commit()
-    db.refresh(seg)
-    return seg
+    return list(ids)
 
 def list_segments_for_sermon(db: Session, sermon_id: int) -> List[models.Segment]:
-    return db.query(models.Segment).filter(models.Segment.sermon_id == sermon_id).order_by(models.Segment.segment_order).all()
+    # lambda_stmt caches the statement construction itself; sermon_id is extracted as a bound param
+    stmt = lambda_stmt(
+        lambda: select(models.Segment)
+        .where(models.Segment.sermon_id == sermon_id)
+        .order_by(models.Segment.segment_order)
+    )
+    return db.execute(stmt).scalars().all()
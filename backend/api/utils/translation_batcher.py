@@ -0,0 +1,93 @@
+# backend/api/utils/translation_batcher.py
+"""
+Micro-batching for on-demand segment retranslation.
+
+Concurrent single-segment requests (e.g. rapid PATCH edits during vetting)
+are queued for a short window and sent to the model as one batch.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+try:
+    from ml_pipeline.translation_model.inference import translate_text_batch
+except Exception as e:
+    logger.error(f"Translation model unavailable: {e}")
+    translate_text_batch = None
+
+BATCH_WINDOW_MS = float(os.getenv("TRANSLATE_BATCH_WINDOW_MS", "20"))
+BATCH_MAX_SIZE = int(os.getenv("TRANSLATE_BATCH_MAX", "16"))
+
+
+class TranslationBatcher:
+    def __init__(self, window_ms: float = BATCH_WINDOW_MS, max_size: int = BATCH_MAX_SIZE):
+        self.window = window_ms / 1000.0
+        self.max_size = max(1, max_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, malay_text: str, use_cache: bool = True) -> Dict:
+        """
+        Queue one text and wait for its translation ({"text", "confidence"}).
+        use_cache=False bypasses the translation cache (explicit retranslate).
+        """
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((malay_text, bool(use_cache), fut))
+        return await fut
+
+    async def _collect(self) -> List[Tuple[str, bool, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.window
+        while len(batch) < self.max_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            if len(batch) > 1:
+                logger.info(f"Coalesced {len(batch)} retranslation requests into one batch.")
+            # Cached and explicit (cache-bypassing) requests go out as separate calls
+            for use_cache in (True, False):
+                group = [(text, fut) for text, flag, fut in batch if flag == use_cache]
+                if group:
+                    await self._translate(group, use_cache)
+
+    async def _translate(self, group: List[Tuple[str, asyncio.Future]], use_cache: bool):
+        texts = [text for text, _ in group]
+        try:
+            if translate_text_batch is None:
+                raise RuntimeError("Translation model not available")
+            results = await run_in_threadpool(translate_text_batch, texts, use_cache=use_cache)
+        except Exception as e:
+            logger.error(f"Batched retranslation failed ({len(texts)} segments): {e}")
+            for _, fut in group:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        for (_, fut), result in zip(group, results):
+            if not fut.done():
+                fut.set_result(result)
+        for _, fut in group[len(results):]:
+            if not fut.done():
+                fut.set_exception(RuntimeError("Translation batch returned too few results"))
+
+
+retranslate_batcher = TranslationBatcher()
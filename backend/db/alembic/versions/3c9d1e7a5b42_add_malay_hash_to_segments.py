@@ -0,0 +1,29 @@
+"""add malay_hash column to segments
+
+Revision ID: 3c9d1e7a5b42
+Revises: fbc64edbbfa7
+Create Date: 2026-10-16 09:12:40.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d1e7a5b42'
+down_revision: Union[str, Sequence[str], None] = 'fbc64edbbfa7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows stay NULL; the digest is computed on demand and stored on next edit.
+    op.add_column('segments', sa.Column('malay_hash', sa.LargeBinary(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('segments', 'malay_hash')
@@ -0,0 +1,42 @@
+"""server-side defaults for sermons.status and segments.is_vetted
+
+Revision ID: 5e8f3a1b7c24
+Revises: d52b7e0c9a16
+Create Date: 2026-10-16 11:48:06.219834
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8f3a1b7c24'
+down_revision: Union[str, Sequence[str], None] = 'd52b7e0c9a16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('sermons', 'status',
+               existing_type=sa.String(length=32),
+               server_default='draft',
+               existing_nullable=True)
+    op.alter_column('segments', 'is_vetted',
+               existing_type=sa.Boolean(),
+               server_default=sa.false(),
+               existing_nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('segments', 'is_vetted',
+               existing_type=sa.Boolean(),
+               server_default=None,
+               existing_nullable=True)
+    op.alter_column('sermons', 'status',
+               existing_type=sa.String(length=32),
+               server_default=None,
+               existing_nullable=True)
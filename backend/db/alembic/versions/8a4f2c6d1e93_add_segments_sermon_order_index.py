@@ -0,0 +1,28 @@
+"""add composite (sermon_id, segment_order) index on segments
+
+Revision ID: 8a4f2c6d1e93
+Revises: 3c9d1e7a5b42
+Create Date: 2026-10-16 10:03:27.551920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4f2c6d1e93'
+down_revision: Union[str, Sequence[str], None] = '3c9d1e7a5b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_segments_sermon_id_segment_order', 'segments', ['sermon_id', 'segment_order'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_segments_sermon_id_segment_order', table_name='segments')
@@ -0,0 +1,28 @@
+"""drop ix_segments_sermon_id (prefix of the composite sermon/order index)
+
+Revision ID: d52b7e0c9a16
+Revises: 8a4f2c6d1e93
+Create Date: 2026-10-16 11:22:48.103517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd52b7e0c9a16'
+down_revision: Union[str, Sequence[str], None] = '8a4f2c6d1e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index(op.f('ix_segments_sermon_id'), table_name='segments')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_segments_sermon_id'), 'segments', ['sermon_id'], unique=False)
@@ -1,28 +1,42 @@
 # backend/db/models.py
 """SQLAlchemy ORM models for the system"""
 
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, DateTime
-from sqlalchemy.sql import func
+import hashlib
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, DateTime, LargeBinary, Index
+from sqlalchemy.orm import configure_mappers
+from sqlalchemy.sql import func, expression
 from backend.db.session import Base
 
+def text_digest(text) -> bytes:
+    """16-byte blake2b digest of the stripped text, used for cheap change detection."""
+    return hashlib.blake2b((text or "").strip().encode("utf-8"), digest_size=16).digest()
+
+def _malay_hash_default(context):
+    return text_digest(context.get_current_parameters().get("malay_text"))
+
 class Sermon(Base):
     __tablename__ = "sermons"
     sermon_id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     speaker = Column(String(150))
     date_uploaded = Column(DateTime(timezone=True), server_default=func.now())
-    status = Column(String(32), default="draft")  # draft, uploaded_raw, segmented, translated, vetted
+    status = Column(String(32), server_default="draft")  # draft, uploaded_raw, segmented, translated, vetted
     raw_text = Column(Text, nullable=True)
 
 class Segment(Base):
     __tablename__ = "segments"
+    __table_args__ = (
+        # serves every "segments of sermon X ordered by segment_order" query without a sort
+        Index("ix_segments_sermon_id_segment_order", "sermon_id", "segment_order"),
+    )
     segment_id = Column(Integer, primary_key=True, index=True)
-    sermon_id = Column(Integer, ForeignKey("sermons.sermon_id", ondelete="CASCADE"), nullable=False, index=True)
+    sermon_id = Column(Integer, ForeignKey("sermons.sermon_id", ondelete="CASCADE"), nullable=False)  # covered by the composite index
     segment_order = Column(Integer, nullable=False)
     malay_text = Column(Text, nullable=False)
+    malay_hash = Column(LargeBinary(16), nullable=True, default=_malay_hash_default)
     english_text = Column(Text, nullable=True)
     confidence_score = Column(Float, nullable=True)
-    is_vetted = Column(Boolean, default=False)
+    is_vetted = Column(Boolean, server_default=expression.false())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 class Log(Base):
@@ -32,3 +46,7 @@ class Log(Base):
     level = Column(String(16), default="INFO")
     message = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# Resolve mappers at import time (once per worker, or once in the master with
+# --preload) instead of lazily inside the first request's query.
+configure_mappers()
@@ -6,6 +6,7 @@ Main FastAPI application entrypoint.
 from contextlib import asynccontextmanager
 import logging
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from backend.api.routes import sermon_routes, live_routes
 from backend.api.routes import translation_routes
@@ -15,16 +16,20 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup — parse the PDF export fonts once so the first export doesn't pay for it
+    if sermon_routes.FPDF is not None:
+        try:
+            await run_in_threadpool(sermon_routes._pdf_template)
+        except Exception as e:
+            logger.warning(f"[MAIN] PDF template warmup failed (exports will retry): {e}")
     yield
     # Shutdown — force stop ASR thread immediately
     logger.info("[MAIN] Lifespan shutdown: stopping ASR...")
     try:
         # Signal live_routes to stop
         live_routes._shutdown_flag.set()
-        # Stop the whisper listener
-        from ml_pipeline.speech_recognition.whisper_listener import stop_listener
-        stop_listener()
+        # Stop the whisper listener (already imported by live_routes)
+        live_routes.stop_listener()
         logger.info("[MAIN] ASR stopped.")
     except Exception as e:
         logger.warning(f"[MAIN] ASR stop error (ignorable): {e}")
@@ -0,0 +1,72 @@
+# Test alignment scoring
+import math
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from ml_pipeline.alignment_module import aligner
+
+WORDS = (
+    "kita hendaklah sentiasa bersyukur kepada allah jemaah dan yang di "
+    "amal solat puasa zakat haji iman taqwa"
+).split()
+
+
+def _segments(rng, n=10):
+    return [
+        SimpleNamespace(
+            segment_id=i,
+            segment_order=i,
+            malay_text=" ".join(rng.choices(WORDS, k=rng.randint(1, 14))),
+        )
+        for i in range(n)
+    ]
+
+
+def _agree(spoken_list, segs, min_score=0.0):
+    assert aligner.match_batch(spoken_list, segs, min_score=min_score) == [
+        aligner.match_spoken_to_segment(t, segs, min_score=min_score) for t in spoken_list
+    ]
+
+
+def test_match_batch_agrees_with_match_spoken_to_segment():
+    pytest.importorskip("rapidfuzz")
+    rng = random.Random(7)
+    for _ in range(200):
+        _agree([" ".join(rng.choices(WORDS, k=rng.randint(1, 10)))], _segments(rng))
+
+
+def test_match_batch_edge_cases():
+    pytest.importorskip("rapidfuzz")
+    segs = _segments(random.Random(3))
+    same = segs[4].malay_text
+
+    # empty spoken text never matches, alongside a real query
+    _agree(["", same], segs)
+    assert aligner.match_batch([""], segs) == [(None, 0.0, None, None)]
+
+    # identical strings: the exact segment wins; on a tie the first one is kept
+    dup = segs + [SimpleNamespace(segment_id=99, segment_order=99, malay_text=same)]
+    _agree([same], dup)
+    assert aligner.match_batch([same], dup, min_score=0.0)[0][2] == segs[4].segment_id
+
+    # a score exactly at the threshold matches; just above it does not
+    score = aligner.match_spoken_to_segment("kita bersyukur", segs, min_score=0.0)[1]
+    _agree(["kita bersyukur"], segs, min_score=score)
+    assert aligner.match_batch(["kita bersyukur"], segs, min_score=score)[0][0] is not None
+    _agree(["kita bersyukur"], segs, min_score=math.nextafter(score, 1.0))
+    assert aligner.match_batch(["kita bersyukur"], segs, min_score=math.nextafter(score, 1.0))[0][0] is None
+
+
+def test_numba_seq_ratio_matches_rapidfuzz(monkeypatch):
+    rapidfuzz = pytest.importorskip("rapidfuzz")
+    if aligner.njit is None:
+        pytest.skip("numba not installed")
+    # force the numba path
+    monkeypatch.setattr(aligner, "fuzz", None)
+    rng = random.Random(11)
+    for _ in range(200):
+        a = " ".join(rng.choices(WORDS, k=rng.randint(0, 8)))
+        b = " ".join(rng.choices(WORDS, k=rng.randint(1, 8)))
+        assert aligner._seq_ratio(a, b) == pytest.approx(rapidfuzz.fuzz.ratio(a, b) / 100.0)
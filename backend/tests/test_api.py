@@ -1 +1,98 @@
-# Test API endpoints
\ No newline at end of file
+# Test API endpoints
+import pytest
+
+from backend.api.routes import sermon_routes
+
+CSV_DATA = "1,a\n4.0,b\n1e0,c\n +7 ,d\n-2,e\nx,f\n3,\n5, g \n\n6\n"
+
+
+def test_parse_segment_csv_accepts_only_integer_orders():
+    assert sermon_routes._parse_segment_csv(CSV_DATA) == [(1, "a"), (7, "d"), (-2, "e"), (5, "g")]
+
+
+def test_parse_segment_csv_matches_without_pandas(monkeypatch):
+    expected = sermon_routes._parse_segment_csv(CSV_DATA)
+    monkeypatch.setattr(sermon_routes, "pd", None)
+    assert sermon_routes._parse_segment_csv(CSV_DATA) == expected
+
+
+@pytest.fixture
+def client():
+    pytest.importorskip("httpx")
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from backend.db import models
+    from backend.db.session import Base
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(models.Sermon(sermon_id=1, title="t"))
+        db.add_all([
+            models.Segment(segment_id=i, sermon_id=1, segment_order=i, malay_text=f"s{i}")
+            for i in (1, 2)
+        ])
+        db.commit()
+
+    def get_db():
+        with Session() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(sermon_routes.router)
+    app.dependency_overrides[sermon_routes.get_db] = get_db
+    yield TestClient(app)
+    engine.dispose()
+
+
+def test_vet_segments_bulk(client):
+    r = client.post("/sermon/segments/vet", json={"segments": [
+        {"segment_id": 1, "english_text": "one"},
+        {"segment_id": "2"},
+        {"segment_id": 99},
+    ]})
+    assert r.status_code == 200
+    assert r.json() == {"ok": True, "updated": 2, "missing": [99], "sermons_vetted": [1]}
+
+
+@pytest.mark.parametrize("payload", [
+    {"segments": ["not-a-dict"]},
+    {"segments": [{"segment_id": "abc"}]},
+    {"segments": [{"english_text": "no id"}]},
+    {"segments": "nope"},
+])
+def test_vet_segments_bulk_rejects_malformed_items(client, payload):
+    assert client.post("/sermon/segments/vet", json=payload).status_code == 422
+
+
+def test_patch_segment_retranslate_without_model_is_503(client, monkeypatch):
+    monkeypatch.setattr(sermon_routes, "translate_text_batch", None)
+    r = client.patch("/sermon/segment/1", json={"retranslate": True})
+    assert r.status_code == 503
+
+
+def test_patch_segment_retranslates_through_the_batcher(client, monkeypatch):
+    from backend.api.utils import translation_batcher
+
+    calls = []
+
+    def translate(texts, use_cache=True):
+        calls.append((list(texts), use_cache))
+        return [{"text": t.upper(), "confidence": 0.5} for t in texts]
+
+    monkeypatch.setattr(sermon_routes, "translate_text_batch", translate)
+    monkeypatch.setattr(translation_batcher, "translate_text_batch", translate)
+    monkeypatch.setattr(sermon_routes, "retranslate_batcher", translation_batcher.TranslationBatcher(window_ms=0))
+
+    r = client.patch("/sermon/segment/1", json={"malay_text": " baru ", "vetted": True})
+    assert r.status_code == 200
+    body = r.json()
+    assert (body["malay_text"], body["english_text"], body["confidence"], body["vetted"]) == ("baru", "BARU", 0.5, True)
+
+    r = client.patch("/sermon/segment/1", json={"retranslate": True})
+    assert r.json()["english_text"] == "BARU"
+    assert calls == [(["baru"], True), (["baru"], False)]
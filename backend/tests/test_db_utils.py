@@ -0,0 +1,30 @@
+# Test DB helper functions
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.api.utils import db_utils
+from backend.db import models
+from backend.db.session import Base
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+    engine.dispose()
+
+
+def test_create_helpers_return_attached_rows(db):
+    sermon = db_utils.create_sermon(db, "Khutbah", speaker="Imam")
+    seg = db_utils.create_segment(db, sermon.sermon_id, 1, "Assalamualaikum")
+    assert sermon in db and seg in db
+    assert sermon.status == "draft"
+    assert seg.malay_hash == models.text_digest("Assalamualaikum")
+
+    seg.english_text = "Peace be upon you"
+    db.commit()
+    db.expire_all()
+    assert db.get(models.Segment, seg.segment_id).english_text == "Peace be upon you"
@@ -0,0 +1,74 @@
+# Test the translation cache in translate_text_batch
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("requests")
+
+from ml_pipeline.translation_model import inference
+
+
+@pytest.fixture
+def marian(monkeypatch):
+    """Stub provider: records each call and echoes the input upper-cased."""
+    calls = []
+
+    def translate(sentences):
+        calls.append(list(sentences))
+        return [{"text": s.upper(), "confidence": 0.9} for s in sentences]
+
+    monkeypatch.setattr(inference, "translate_with_marian", translate)
+    monkeypatch.setattr(inference, "TRANSLATION_CACHE_SIZE", 4096)
+    inference._translation_cache.clear()
+    yield calls
+    inference._translation_cache.clear()
+
+
+def test_repeated_inputs_only_reach_the_model_once(marian):
+    out = inference.translate_text_batch(["a", "b", "a"], provider="marian")
+    assert [r["text"] for r in out] == ["A", "B", "A"]
+    assert marian == [["a", "b"]]
+
+    out = inference.translate_text_batch(["b", "c"], provider="marian")
+    assert [r["text"] for r in out] == ["B", "C"]
+    assert marian[-1] == ["c"]
+
+
+def test_cache_hits_are_copies(marian):
+    inference.translate_text_batch(["a"], provider="marian")
+    inference.translate_text_batch(["a"], provider="marian")[0]["text"] = "mutated"
+    assert inference.translate_text_batch(["a"], provider="marian")[0]["text"] == "A"
+
+
+def test_use_cache_false_refetches_and_refreshes(marian):
+    inference.translate_text_batch(["a"], provider="marian")
+    inference.translate_text_batch(["a"], provider="marian", use_cache=False)
+    assert marian == [["a"], ["a"]]
+    inference.translate_text_batch(["a"], provider="marian")
+    assert len(marian) == 2
+
+
+def test_lru_evicts_least_recently_used(marian, monkeypatch):
+    monkeypatch.setattr(inference, "TRANSLATION_CACHE_SIZE", 2)
+    inference.translate_text_batch(["a", "b"], provider="marian")
+    inference.translate_text_batch(["a"], provider="marian")  # touch a; b is now oldest
+    inference.translate_text_batch(["c"], provider="marian")  # evicts b
+    marian.clear()
+    inference.translate_text_batch(["a", "b", "c"], provider="marian")
+    assert marian == [["b"]]
+
+
+def test_zero_confidence_results_are_not_cached(marian, monkeypatch):
+    monkeypatch.setattr(
+        inference, "translate_with_marian",
+        lambda sentences: marian.append(list(sentences)) or [{"text": "[Translation Error]", "confidence": 0.0}] * len(sentences),
+    )
+    inference.translate_text_batch(["a"], provider="marian")
+    inference.translate_text_batch(["a"], provider="marian")
+    assert marian == [["a"], ["a"]]
+
+
+def test_short_provider_result_is_padded(marian, monkeypatch):
+    monkeypatch.setattr(inference, "translate_with_marian", lambda sentences: [{"text": "X", "confidence": 0.9}])
+    out = inference.translate_text_batch(["a", "b"], provider="marian")
+    assert out == [{"text": "X", "confidence": 0.9}, {"text": "[Translation missing]", "confidence": 0.0}]
@@ -0,0 +1,16 @@
+# Test sermon text segmentation
+from ml_pipeline.alignment_module.segmenter import split_by_word_count
+
+
+def test_split_by_word_count_chunks_long_section_that_keeps_a_comma():
+    # "1,000" and the trailing comma survive the comma split; this used to recurse forever
+    words = [f"w{i}" for i in range(20)]
+    sentence = " ".join(words[:10]) + " 1,000 " + " ".join(words[10:]) + ","
+    assert split_by_word_count(sentence, max_words=18) == [
+        " ".join(words[:10] + ["1,000"] + words[10:17]),
+        " ".join(words[17:]) + ",",
+    ]
+
+
+def test_split_by_word_count_splits_at_commas_first():
+    assert split_by_word_count("satu dua, tiga empat", max_words=18) == ["satu dua,", "tiga empat"]
@@ -0,0 +1,75 @@
+# Test retranslation micro-batching
+import asyncio
+
+import pytest
+
+from backend.api.utils import translation_batcher
+from backend.api.utils.translation_batcher import TranslationBatcher
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Stub model: records each batch and echoes the input upper-cased."""
+    seen = []
+
+    def translate(texts, use_cache=True):
+        seen.append((list(texts), use_cache))
+        return [{"text": t.upper(), "confidence": 0.9} for t in texts]
+
+    monkeypatch.setattr(translation_batcher, "translate_text_batch", translate)
+    return seen
+
+
+def _submit_all(batcher, texts, use_cache=True):
+    async def main():
+        return await asyncio.gather(
+            *(batcher.submit(t, use_cache) for t in texts), return_exceptions=True
+        )
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_share_one_model_call(calls):
+    out = _submit_all(TranslationBatcher(window_ms=50), ["a", "b", "c"])
+    assert [r["text"] for r in out] == ["A", "B", "C"]
+    assert calls == [(["a", "b", "c"], True)]
+
+
+def test_batches_are_capped_at_max_size(calls):
+    out = _submit_all(TranslationBatcher(window_ms=50, max_size=2), list("abcde"))
+    assert [r["text"] for r in out] == list("ABCDE")
+    assert [texts for texts, _ in calls] == [["a", "b"], ["c", "d"], ["e"]]
+
+
+def test_cache_bypassing_requests_are_sent_separately(calls):
+    batcher = TranslationBatcher(window_ms=50)
+
+    async def main():
+        return await asyncio.gather(batcher.submit("a"), batcher.submit("b", False))
+
+    assert [r["text"] for r in asyncio.run(main())] == ["A", "B"]
+    assert calls == [(["a"], True), (["b"], False)]
+
+
+def test_model_error_fails_every_request_in_the_batch(monkeypatch):
+    def translate(texts, use_cache=True):
+        raise ValueError("model down")
+
+    monkeypatch.setattr(translation_batcher, "translate_text_batch", translate)
+    out = _submit_all(TranslationBatcher(window_ms=50), ["a", "b"])
+    assert all(isinstance(r, ValueError) for r in out)
+
+
+def test_short_result_fails_only_the_unanswered_requests(monkeypatch):
+    monkeypatch.setattr(
+        translation_batcher, "translate_text_batch",
+        lambda texts, use_cache=True: [{"text": "A", "confidence": 0.9}],
+    )
+    first, second = _submit_all(TranslationBatcher(window_ms=50), ["a", "b"])
+    assert first == {"text": "A", "confidence": 0.9}
+    assert isinstance(second, RuntimeError)
+
+
+def test_missing_model_raises(monkeypatch):
+    monkeypatch.setattr(translation_batcher, "translate_text_batch", None)
+    (out,) = _submit_all(TranslationBatcher(window_ms=0), ["a"])
+    assert isinstance(out, RuntimeError)
@@ -13,6 +13,7 @@ export const ENDPOINTS = {
   SERMON_DELETE: (id: number) => `/sermon/${id}`,
   SERMON_EXPORT: (id: number, format: string) => `/sermon/${id}/export?format=${format}`,
   SEGMENT_PATCH: (segmentId: number) => `/sermon/segment/${segmentId}`,
+  SEGMENTS_VET_BULK: '/sermon/segments/vet',
   
   // Live endpoints (from live_routes.py with /live prefix)
   LIVE_STREAM: (sermonId: number) => `/live/stream?sermon_id=${sermonId}`,
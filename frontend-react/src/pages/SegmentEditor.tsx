@@ -183,11 +183,7 @@ export function SegmentEditor({ onNavigate, sermonId }: SegmentEditorProps) {
     if (selectedSegments.size === 0) return;
     setSavingSegment(-1);
     try {
-      await Promise.all(
-        Array.from(selectedSegments).map(segmentId =>
-          sermonApi.updateSegment(segmentId, { vetted: true })
-        )
-      );
+      await sermonApi.vetSegments(Array.from(selectedSegments));
       toast.success(`Approved ${selectedSegments.size} segments`);
       setSelectedSegments(new Set());
       setBulkActionsOpen(false);
@@ -208,11 +204,7 @@ export function SegmentEditor({ onNavigate, sermonId }: SegmentEditorProps) {
     }
     setSavingSegment(-1);
     try {
-      await Promise.all(
-        translatedSegments.map(segment =>
-          sermonApi.updateSegment(segment.segment_id, { vetted: true })
-        )
-      );
+      await sermonApi.vetSegments(translatedSegments.map(segment => segment.segment_id));
       toast.success(`Approved ${translatedSegments.length} translated segments`);
       setBulkActionsOpen(false);
       loadSermonData();
@@ -120,6 +120,16 @@ export const sermonApi = {
     return response.data;
   },
 
+  // Vet many segments in one request (backend: POST /sermon/segments/vet)
+  vetSegments: async (
+    segmentIds: number[]
+  ): Promise<{ ok: boolean; updated: number; missing: number[]; sermons_vetted: number[] }> => {
+    const response = await api.post(ENDPOINTS.SEGMENTS_VET_BULK, {
+      segments: segmentIds.map(segment_id => ({ segment_id, vetted: true })),
+    });
+    return response.data;
+  },
+
   // Delete a sermon
   delete: async (sermonId: number): Promise<{ ok: boolean; deleted_sermon_id: number }> => {
     const response = await api.delete(ENDPOINTS.SERMON_DELETE(sermonId));
@@ -5,10 +5,29 @@ Improved with partial substring scoring (better for ASR short chunks).
 """
 
 import re
+import sys
 import difflib
+import functools
+import heapq
 import logging
+from bisect import bisect_left, bisect_right
 logger = logging.getLogger(__name__)
 
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = process = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit, types as nbtypes
+except ImportError:
+    njit = None
+
 SYN_MAP = {
     "jamaah": "jemaah",
     "muslimin": "muslimin",
@@ -17,6 +36,22 @@ SYN_MAP = {
     "allah": "allah",
 }
 
+# only real rewrites need applying; identity entries are no-ops
+_SYN_REWRITES = {k: v for k, v in SYN_MAP.items() if k != v}
+# literal alternation (no \b) so the regex engine can use its fast substring search
+_SYN_PROBE = re.compile("|".join(map(re.escape, _SYN_REWRITES))) if _SYN_REWRITES else None
+
+_RE_PUNCT = re.compile(r"[^\w\s]")
+
+class _PunctTable(dict):
+    r"""str.translate table: chars matching [^\w\s] -> space, classified once per code point."""
+    def __missing__(self, cp: int) -> int:
+        val = 32 if _RE_PUNCT.match(chr(cp)) else cp
+        self[cp] = val
+        return val
+
+_PUNCT_TABLE = _PunctTable()
+
 STOP = {
     "dan","yang","di","ke","dari","pada","untuk","dalam",
     "ini","itu","para","jemaah","sekalian","akan","tidak","dengan"
@@ -25,24 +60,61 @@ STOP = {
 # -------------------------------
 # Normalization
 # -------------------------------
+@functools.lru_cache(maxsize=4096)
 def _norm(s: str) -> str:
-    s = s.lower()
-    s = re.sub(r"[^\w\s]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    s = " ".join(SYN_MAP.get(w, w) for w in s.split())
-    return s
+    s = s.lower().translate(_PUNCT_TABLE)
+    # split() already collapses and trims whitespace; the per-token synonym
+    # lookup only runs when a substring check says a rewrite can apply
+    if _SYN_PROBE is not None and _SYN_PROBE.search(s):
+        return " ".join(_SYN_REWRITES.get(w, w) for w in s.split())
+    return " ".join(s.split())
 
 def _token_set(s: str):
     toks = [t for t in s.split() if t and t not in STOP]
     return set(toks), toks
 
+if njit is not None:
+    # eager signature (read-only code-point arrays, as _codepoints() returns):
+    # compiled, or loaded from cache, at import instead of on the first live chunk
+    _CP_ARRAY = nbtypes.Array(nbtypes.uint32, 1, "C", readonly=True)
+
+    @njit(nbtypes.int32(_CP_ARRAY, _CP_ARRAY), cache=True)
+    def _lcs_len(a, b):
+        # two-row LCS DP over code-point arrays
+        m = b.shape[0]
+        prev = np.zeros(m + 1, np.int32)
+        cur = np.zeros(m + 1, np.int32)
+        for i in range(a.shape[0]):
+            ai = a[i]
+            for j in range(m):
+                if ai == b[j]:
+                    cur[j + 1] = prev[j] + 1
+                elif prev[j + 1] >= cur[j]:
+                    cur[j + 1] = prev[j + 1]
+                else:
+                    cur[j + 1] = cur[j]
+            prev, cur = cur, prev
+        return prev[m]
+
+def _codepoints(s: str):
+    return np.frombuffer(s.encode("utf-32-le"), dtype=np.uint32)
+
 def _seq_ratio(a: str, b: str) -> float:
-    return difflib.SequenceMatcher(None, a, b).ratio()
+    # rapidfuzz's ratio is the same 2*M/T measure, computed in C++ (bit-parallel)
+    if fuzz is not None:
+        return fuzz.ratio(a, b) / 100.0
+    # numba fallback: same measure with M = exact LCS length, compiled to native code
+    if njit is not None:
+        total = len(a) + len(b)
+        return 2.0 * _lcs_len(_codepoints(a), _codepoints(b)) / total if total else 1.0
+    return difflib.SequenceMatcher(None, a, b, autojunk=False).ratio()
 
 def _jaccard(sa: set, sb: set) -> float:
     if not sa or not sb:
         return 0.0
-    return len(sa & sb) / len(sa | sb)
+    # |A u B| by inclusion-exclusion: one temporary set instead of two
+    inter = len(sa & sb)
+    return inter / (len(sa) + len(sb) - inter)
 
 def _length_factor(ta, tb) -> float:
     la, lb = len(ta), len(tb)
@@ -53,7 +125,7 @@ def _length_factor(ta, tb) -> float:
 # -------------------------------
 # NEW: Partial Match Boost
 # -------------------------------
-def _partial_boost(a: str, b: str) -> float:
+def _partial_boost(a: str, b: str, b_words: set = None) -> float:
     """
     Boost score when spoken chunk is a clean substring of a longer segment.
     Example:
@@ -68,7 +140,8 @@ def _partial_boost(a: str, b: str) -> float:
 
     # soft boost if many tokens overlap sequentially
     a_words = a.split()
-    b_words = b.split()
+    if b_words is None:
+        b_words = set(b.split())
 
     overlap = sum(1 for w in a_words if w in b_words)
     ratio = overlap / max(1, len(a_words))
@@ -80,25 +153,143 @@ def _partial_boost(a: str, b: str) -> float:
     return 0.0
 
 
+# -------------------------------
+# Precomputed features
+# -------------------------------
+def _features(text: str):
+    """(norm, token_set, token_list, word_set) for one text; word_set keeps stopwords."""
+    n = _norm(text)
+    sa, ta = _token_set(n)
+    return n, sa, ta, set(n.split())
+
+def _build_segment_features(seg):
+    """
+    _features() for a segment's Malay text, with the norm and its tokens
+    interned: they live for the whole session and are compared against every
+    spoken chunk, so repeated words/phrases share one object and equal
+    strings compare by identity.
+    """
+    n = sys.intern(_norm((seg.malay_text or "").strip()))
+    words = [sys.intern(w) for w in n.split()]
+    ta = [w for w in words if w not in STOP]
+    return n, set(ta), ta, set(words)
+
+class SegmentStore:
+    """
+    Struct-of-arrays view of a sermon's segments (sorted by segment_order):
+    parallel lists of segments, orders and precomputed features, built once
+    per live session. Lookahead windows are index ranges into it.
+    """
+    def __init__(self, segments):
+        self.segments = list(segments)
+        self.orders = [seg.segment_order for seg in self.segments]
+        self.feats = [_segment_features(seg) for seg in self.segments]
+        self._simhashes = None
+
+    def __len__(self):
+        return len(self.segments)
+
+    def window(self, after_order: int, limit: int):
+        """(lo, hi) range of up to `limit` segments with segment_order > after_order."""
+        lo = bisect_right(self.orders, after_order)
+        return lo, min(lo + max(limit, 0), len(self.segments))
+
+    def between(self, after_order: int, before_order: int):
+        """Segments with after_order < segment_order < before_order."""
+        lo = bisect_right(self.orders, after_order)
+        hi = bisect_left(self.orders, before_order)
+        return self.segments[lo:hi]
+
+    def shortlist(self, texts, lo: int, hi: int, k: int):
+        """
+        Sorted indices in [lo, hi) of the k segments nearest each text by
+        simhash Hamming distance (union over texts). Hashes are built on first use.
+        """
+        if self._simhashes is None:
+            self._simhashes = [_simhash(f[2]) for f in self.feats]
+        hashes = self._simhashes
+        keep = set()
+        for text in texts:
+            q = _simhash(_features(text)[2])
+            keep.update(heapq.nsmallest(k, range(lo, hi), key=lambda j: (hashes[j] ^ q).bit_count()))
+        return sorted(keep)
+
+def _simhash(tokens) -> int:
+    """64-bit simhash: each token's hash votes per bit (repeats vote again)."""
+    votes = [0] * 64
+    for t in tokens:
+        h = hash(t)
+        for i in range(64):
+            votes[i] += 1 if (h >> i) & 1 else -1
+    return sum(1 << i for i, v in enumerate(votes) if v > 0)
+
+def _segment_features(seg):
+    feats = getattr(seg, "_align_feats", None)
+    if feats is None:
+        feats = _build_segment_features(seg)
+        seg._align_feats = feats
+    return feats
+
+def _segment_matcher(seg):
+    """
+    difflib fallback: a SequenceMatcher per segment with the segment text as
+    seq2, so its b2j index is built once per session rather than per chunk.
+    (seq2 stays the candidate: ratio() is not symmetric in its arguments.)
+    """
+    sm = getattr(seg, "_align_sm", None)
+    if sm is None:
+        sm = difflib.SequenceMatcher(None, autojunk=False)
+        sm.set_seq2(_segment_features(seg)[0])
+        seg._align_sm = sm
+    return sm
+
+
 # -------------------------------
 # Master Similarity
 # -------------------------------
-def similarity(spoken: str, cand: str) -> float:
-    a = _norm(spoken)
-    b = _norm(cand)
+def similarity(spoken: str, cand: str, best_score_so_far: float = None) -> float:
+    """
+    Blended similarity in [0, 1]. With best_score_so_far, returns 0.0 without
+    computing the sequence ratio when the score cannot beat it.
+    """
+    sc = _score(_features(spoken), _features(cand), floor=best_score_so_far)
+    return 0.0 if sc is None else sc
+
+def _clip(score: float) -> float:
+    return round(min(1.0, max(0.0, score)), 3)
+
+def _score(fa, fb, floor: float = None, seq: float = None, sm=None):
+    """
+    Blended score for two feature tuples. With `floor`, returns None as soon
+    as the score provably cannot exceed it, skipping the sequence ratio.
+    A precomputed `seq` ratio (e.g. from cdist) is used as-is; a difflib
+    matcher `sm` already holding fb's text as seq2 is reused if given.
+    """
+    a, sa, ta, _ = fa
+    b, sb, tb, wb = fb
     if not a or not b:
         return 0.0
 
-    sa, ta = _token_set(a)
-    sb, tb = _token_set(b)
-
-    seq = _seq_ratio(a, b)
     jac = _jaccard(sa, sb)
     lenf = _length_factor(ta, tb)
-    part = _partial_boost(a, b)
+    part = _partial_boost(a, b, wb)
 
-    score = 0.45 * seq + 0.30 * jac + 0.15 * lenf + part
-    return round(min(1.0, max(0.0, score)), 3)
+    if seq is not None:
+        return _clip(0.45 * seq + 0.30 * jac + 0.15 * lenf + part)
+
+    if floor is not None:
+        # any 2*M/T matching ratio is at most 2*min(la, lb) / (la + lb)
+        la, lb = len(a), len(b)
+        seq_max = 2.0 * min(la, lb) / (la + lb)
+        if _clip(0.45 * seq_max + 0.30 * jac + 0.15 * lenf + part) <= floor:
+            return None
+
+    if sm is not None:
+        sm.set_seq1(a)
+        seq = sm.ratio()
+    else:
+        seq = _seq_ratio(a, b)
+    return _clip(0.45 * seq + 0.30 * jac + 0.15 * lenf + part)
 
 
 # -------------------------------
@@ -110,20 +301,75 @@ def match_spoken_to_segment(spoken_text: str, segments, min_score: float = 0.45)
 
     best_seg = None
     best_score = 0.0
+    spoken_feats = _features(spoken_text)
+
+    use_difflib = fuzz is None and njit is None
 
     for seg in segments:
-        cand = (seg.malay_text or "").strip()
-        if not cand:
+        cand_feats = _segment_features(seg)
+        if not cand_feats[0]:
             continue
 
-        sc = similarity(spoken_text, cand)
-        if sc > best_score:
+        sc = _score(spoken_feats, cand_feats, floor=best_score,
+                    sm=_segment_matcher(seg) if use_difflib else None)
+        if sc is not None and sc > best_score:
             best_score = sc
             best_seg = seg
 
+    return _result(spoken_text, best_seg, best_score, min_score)
+
+
+def match_batch(spoken_list, segments, min_score: float = 0.45, window=None, top_k: int = 0):
+    """
+    Match several spoken texts against the same candidate segments.
+    `segments` is a list or a SegmentStore (optionally limited to a
+    (lo, hi) `window` from SegmentStore.window). With a store and top_k > 0,
+    only the top_k simhash-nearest segments per text are scored (approximate).
+    With rapidfuzz, every sequence ratio comes from one process.cdist call.
+    Returns one match_spoken_to_segment() tuple per spoken text.
+    """
+    if isinstance(segments, SegmentStore):
+        lo, hi = window if window is not None else (0, len(segments))
+        if top_k > 0 and hi - lo > top_k:
+            idx = segments.shortlist([t for t in spoken_list if t], lo, hi, top_k)
+            segs = [segments.segments[j] for j in idx]
+            feats = [segments.feats[j] for j in idx]
+        else:
+            segs, feats = segments.segments[lo:hi], segments.feats[lo:hi]
+    else:
+        segs = list(segments or [])
+        feats = [_segment_features(seg) for seg in segs]
+    cands = [(seg, f) for seg, f in zip(segs, feats) if f[0]]
+    queries = [(i, t, _features(t)) for i, t in enumerate(spoken_list) if t]
+    if process is None or np is None or not cands or not queries:
+        return [match_spoken_to_segment(t, segs, min_score) for t in spoken_list]
+
+    seqs = process.cdist(
+        [f[0] for _, _, f in queries],
+        [f[0] for _, f in cands],
+        scorer=fuzz.ratio,
+        # cdist defaults to float32; exact ratios keep scores identical to fuzz.ratio
+        dtype=np.float64,
+    )
+
+    results = [(None, 0.0, None, None)] * len(spoken_list)
+    for row, (i, text, q_feats) in zip(seqs, queries):
+        best_seg = None
+        best_score = 0.0
+        for (seg, c_feats), seq in zip(cands, row):
+            sc = _score(q_feats, c_feats, seq=float(seq) / 100.0)
+            if sc > best_score:
+                best_score = sc
+                best_seg = seg
+        results[i] = _result(text, best_seg, best_score, min_score)
+    return results
+
+
+def _result(spoken_text: str, best_seg, best_score: float, min_score: float):
     if best_seg and best_score >= min_score:
-        logger.info(f"[ALIGN] match id={best_seg.segment_id} score={best_score} spoken='{spoken_text}'")
+        # %-style args: the message is only built if INFO is enabled
+        logger.info("[ALIGN] match id=%s score=%s spoken='%s'", best_seg.segment_id, best_score, spoken_text)
         return best_seg, best_score, best_seg.segment_id, best_seg.segment_order
 
-    logger.info(f"[ALIGN] no-match best={best_score} spoken='{spoken_text}'")
+    logger.info("[ALIGN] no-match best=%s spoken='%s'", best_score, spoken_text)
     return None, best_score, getattr(best_seg, "segment_id", None), getattr(best_seg, "segment_order", None)
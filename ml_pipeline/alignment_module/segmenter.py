@@ -1,7 +1,13 @@
 # ml_pipeline/alignment_module/segmenter.py
 
 import re
-from typing import List
+from itertools import repeat
+from typing import Iterable, Iterator, List, Optional
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 # ============================================================
 # KHUTBAH MARKERS
@@ -17,77 +23,118 @@ KHUTBAH_MARKERS = [
     r"\bkesimpulannya\b",
 ]
 
+# one alternation instead of a search per marker; IGNORECASE replaces lower()
+_MARKERS_RE = re.compile("|".join(f"(?:{m})" for m in KHUTBAH_MARKERS), re.IGNORECASE)
+
+# with pyahocorasick, one automaton pass over the literal phrases replaces the
+# regex scan; the \b boundaries are then checked at each hit
+if ahocorasick is not None:
+    _MARKERS_AC = ahocorasick.Automaton()
+    for _m in KHUTBAH_MARKERS:
+        _lit = _m.replace(r"\b", "")
+        _MARKERS_AC.add_word(_lit, len(_lit))
+    _MARKERS_AC.make_automaton()
+else:
+    _MARKERS_AC = None
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == "_"
+
+def _has_marker(s: str, low: Optional[str] = None) -> bool:
+    """`low` is s.lower() if the caller already has it (automaton path only)."""
+    if _MARKERS_AC is None:
+        return _MARKERS_RE.search(s) is not None
+    if low is None:
+        low = s.lower()
+    for end, n in _MARKERS_AC.iter(low):
+        start = end - n + 1
+        if (start == 0 or not _is_word_char(low[start - 1])) and \
+                (end + 1 == len(low) or not _is_word_char(low[end + 1])):
+            return True
+    return False
+
+_RE_WS = re.compile(r"\s+")
+_RE_SENT = re.compile(r"(?<=[.!?])\s+")
+_RE_COMMA = re.compile(r"(?<=,)\s+")
+
 # ============================================================
 # BASIC CLEAN
 # ============================================================
 def clean_text(t: str) -> str:
-    t = re.sub(r"\r", " ", t)
-    t = re.sub(r"\s+", " ", t)
+    # \s already covers \r, so one pass collapses CR and all other whitespace
+    t = _RE_WS.sub(" ", t)
     return t.strip()
 
 # ============================================================
 # SENTENCE SPLITTER
 # ============================================================
 def hard_sentence_split(t: str) -> List[str]:
-    parts = re.split(r"(?<=[.!?])\s+", t)
-    return [p.strip() for p in parts if p.strip()]
+    return list(_iter_sentences(t))
+
+def _iter_sentences(t: str) -> Iterator[str]:
+    for p in _RE_SENT.split(t):
+        p = p.strip()
+        if p:
+            yield p
 
 # ============================================================
 # SPLIT BY WORD COUNT (primary rule = 18 words)
 # ============================================================
 def split_by_word_count(sentence: str, max_words: int = 18) -> List[str]:
-    words = sentence.split()
-
-    # Split at commas first
+    # Split at commas first; sections are tokenized once and chunked by index
     if "," in sentence:
-        sections = re.split(r"(?<=,)\s+", sentence)
         final_parts = []
-        for sec in sections:
-            if len(sec.split()) > max_words:
-                final_parts.extend(split_by_word_count(sec, max_words))
+        for sec in _RE_COMMA.split(sentence):
+            words = sec.split()
+            if len(words) > max_words:
+                final_parts.extend(_chunk_words(words, max_words))
             else:
                 final_parts.append(sec.strip())
         return final_parts
 
+    words = sentence.split()
+
     # If already short enough
     if len(words) <= max_words:
         return [sentence]
 
     # Otherwise chunk it
-    out = []
-    for i in range(0, len(words), max_words):
-        out.append(" ".join(words[i:i+max_words]).strip())
+    return _chunk_words(words, max_words)
 
-    return out
+def _chunk_words(words: List[str], max_words: int) -> List[str]:
+    return [" ".join(words[i:i + max_words]) for i in range(0, len(words), max_words)]
 
 # ============================================================
 # ENFORCE KHUTBAH MARKERS
 # ============================================================
 def enforce_markers(sentences: List[str]) -> List[str]:
-    out = []
+    return list(_iter_markers(sentences))
+
+def _iter_markers(sentences: Iterable[str], lowered: Optional[Iterable[str]] = None) -> Iterator[str]:
+    # lowered: the same sentences lower-cased, in the same order
     buf = []
+    has_marker = _has_marker
 
-    for s in sentences:
-        low = s.lower()
-        if any(re.search(m, low) for m in KHUTBAH_MARKERS):
+    for s, low in zip(sentences, repeat(None) if lowered is None else lowered):
+        if has_marker(s, low):
             # Flush buffer before marker
             if buf:
-                out.append(" ".join(buf).strip())
+                yield " ".join(buf).strip()
                 buf = []
-            out.append(s.strip())
+            yield s.strip()
         else:
             buf.append(s)
 
     if buf:
-        out.append(" ".join(buf).strip())
-
-    return out
+        yield " ".join(buf).strip()
 
 # ============================================================
 # MERGE ONLY TINY SEGMENTS WITHOUT MAKING LONG ONES
 # ============================================================
 def merge_small(segs: List[str], min_chars: int = 35) -> List[str]:
-    out = []
+    return list(_iter_merge_small(segs, min_chars))
+
+def _iter_merge_small(segs: Iterable[str], min_chars: int = 35) -> Iterator[str]:
     buf = ""
 
     for s in segs:
@@ -99,49 +146,50 @@ def merge_small(segs: List[str], min_chars: int = 35) -> List[str]:
             buf = candidate
         else:
             if buf:
-                out.append(buf)
+                yield buf
             buf = s
 
     if buf:
-        out.append(buf)
-
-    return out
+        yield buf
 
 # ============================================================
 # FINAL HARD CAP = STRICT 15 WORDS MAX
 # ============================================================
 def enforce_hard_cap(segments: List[str], hard_max: int = 15) -> List[str]:
-    final = []
+    return list(_iter_hard_cap(segments, hard_max))
+
+def _iter_hard_cap(segments: Iterable[str], hard_max: int = 15) -> Iterator[str]:
     for seg in segments:
         words = seg.split()
         if len(words) > hard_max:
             # recursive split
-            final.extend(split_by_word_count(seg, max_words=hard_max))
+            yield from split_by_word_count(seg, max_words=hard_max)
         else:
-            final.append(seg)
-    return final
+            yield seg
 
 # ============================================================
 # MASTER FUNCTION
 # ============================================================
 def segment_text(raw: str, max_len: int = 180) -> List[str]:
+    # Stages are chained generators: each sentence streams through all five
+    # steps and only the final list is materialized.
     raw = clean_text(raw)
 
     # 1. Split into sentences
-    sents = hard_sentence_split(raw)
+    sents = _iter_sentences(raw)
 
     # 2. Enforce khutbah markers as boundaries
-    marked = enforce_markers(sents)
+    # (the automaton is case-sensitive: lower the whole text once and split it
+    # alongside; lower() never adds or removes whitespace or .!? so the
+    # sentences line up)
+    lowered = _iter_sentences(raw.lower()) if _MARKERS_AC is not None else None
+    marked = _iter_markers(sents, lowered)
 
     # 3. Split long sentences by 18-word blocks
-    chunks = []
-    for s in marked:
-        chunks.extend(split_by_word_count(s, max_words=18))
+    chunks = (c for s in marked for c in split_by_word_count(s, max_words=18))
 
     # 4. Merge only very small segments
-    merged = merge_small(chunks, min_chars=35)
+    merged = _iter_merge_small(chunks, min_chars=35)
 
     # 5. FINAL HARD SAFETY CAP at 15 words (NEVER exceed)
-    final_segments = enforce_hard_cap(merged, hard_max=15)
-
-    return final_segments
+    return list(_iter_hard_cap(merged, hard_max=15))
@@ -7,13 +7,19 @@ Optimized for masjid acoustics (echo, reverb, low-volume Khatib voices).
 Fully backward-compatible with your existing system.
 """
 
-import os, queue, logging, threading, re
+import os, logging, threading, re, time
+from array import array
 from typing import Generator, Optional
 import numpy as np
 import sounddevice as sd
 import torch
 from faster_whisper import WhisperModel
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 # -------------------------------------------------
 # Configuration
 # -------------------------------------------------
@@ -28,9 +34,22 @@ COMPUTE_TYPE_ENV = os.getenv("WHISPER_COMPUTE")
 
 BLOCK_SECONDS = float(os.getenv("WHISPER_BLOCK_SECS", "6"))
 MIN_CHARS = int(os.getenv("WHISPER_MIN_CHARS", "6"))
+# greedy decoding by default; WHISPER_BEAM=3 trades latency for accuracy on recordings
+BEAM_SIZE = int(os.getenv("WHISPER_BEAM", "1"))
 
 VERBOSE_CHUNKS = os.getenv("WHISPER_VERBOSE", "true").lower() in {"1","true","yes"}
 VAD_ENABLED = os.getenv("WHISPER_VAD", "true").lower() in {"1","true","yes"}
+# blocks whose RMS level (full scale = 1.0) is below this skip Whisper entirely;
+# 0.003 is about -50 dBFS (0 = off)
+RMS_GATE = float(os.getenv("WHISPER_RMS_GATE", "0.003"))
+# load the model and run one dummy pass in the background at import time
+WARMUP = os.getenv("WHISPER_WARMUP", "false").lower() in {"1","true","yes"}
+
+# LocalAgreement-2 streaming: re-transcribe a rolling buffer every MIN_CHUNK
+# seconds and emit only the words two consecutive passes agree on
+LOCAL_AGREEMENT = os.getenv("WHISPER_LOCAL_AGREEMENT", "false").lower() in {"1","true","yes"}
+MIN_CHUNK_SECONDS = float(os.getenv("WHISPER_MIN_CHUNK_SECS", "1.0"))
+MAX_BUFFER_SECONDS = float(os.getenv("WHISPER_MAX_BUFFER_SECS", "30"))
 
 # Masjid echo + khutbah bias
 INITIAL_PROMPT = (
@@ -39,11 +58,22 @@ INITIAL_PROMPT = (
     "Abaikan bunyi gema, pantulan, atau hingar dalam masjid."
 )
 
+_RE_WS = re.compile(r"\s+")
+
 # -------------------------------------------------
 # Internal State
 # -------------------------------------------------
-_audio_q: "queue.Queue[np.ndarray]" = queue.Queue(maxsize=32)
+# Single-producer/single-consumer audio ring: the sounddevice callback writes
+# mono samples and advances _tail, the listener reads and advances _head.
+# Both counters only grow (total samples); each has exactly one writer, and
+# CPython stores to an array('Q') slot atomically, so no lock is needed.
+RING_SECONDS = 30
+_RING = np.empty(max(SAMPLE_RATE * RING_SECONDS, 2 * int(SAMPLE_RATE * BLOCK_SECONDS)), dtype=np.float32)
+_RING_N = _RING.shape[0]
+_head = array("Q", [0])
+_tail = array("Q", [0])
 _model: Optional[WhisperModel] = None
+_model_lock = threading.Lock()
 
 _stop_flag = threading.Event()
 _last_text = ""
@@ -63,8 +93,14 @@ def _compute_type(real_device: str) -> str:
     if COMPUTE_TYPE_ENV:
         return COMPUTE_TYPE_ENV
 
-    # Best settings for Large-V3
-    return "float16" if real_device == "cuda" else "int8_float32"
+    if real_device == "cuda":
+        # int8 weights + fp16 activations: half the weight bytes, INT8 tensor
+        # cores on Volta and newer; older GPUs stay on plain float16
+        major, _minor = torch.cuda.get_device_capability()
+        return "int8_float16" if major >= 7 else "float16"
+
+    # int8 weights, float32 activations keep CPU decoding accurate
+    return "int8_float32"
 
 
 def _load_model() -> WhisperModel:
@@ -72,35 +108,129 @@ def _load_model() -> WhisperModel:
     if _model:
         return _model
 
-    real_device = _resolve_device()
-    compute = _compute_type(real_device)
+    # the warmup thread and the listener may race here; load only once
+    with _model_lock:
+        if _model:
+            return _model
 
-    logging.info(f"[ASR] Loading Faster-Whisper {MODEL_NAME} ({real_device}, {compute})")
+        real_device = _resolve_device()
+        compute = _compute_type(real_device)
 
-    _model = WhisperModel(
-        MODEL_NAME,
-        device=real_device,
-        compute_type=compute,
-        cpu_threads=8,
-        num_workers=2
-    )
+        logging.info(f"[ASR] Loading Faster-Whisper {MODEL_NAME} ({real_device}, {compute})")
+
+        _model = WhisperModel(
+            MODEL_NAME,
+            device=real_device,
+            compute_type=compute,
+            cpu_threads=8,
+            num_workers=2
+        )
     return _model
 
 
+def _warmup():
+    """Load the model (and VAD) and decode one second of silence, so the first live block skips cold-start costs."""
+    t0 = time.perf_counter()
+    try:
+        model = _load_model()
+        silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        # VAD off so the decoder actually runs on the silence
+        list(_transcribe(model, silence, vad_filter=False))  # faster-whisper only decodes while iterating
+        if VAD_ENABLED:
+            # loads and caches faster-whisper's bundled Silero VAD
+            list(_transcribe(model, silence, vad_filter=True))
+        logging.info(f"[ASR] Warmup done in {time.perf_counter() - t0:.2f}s")
+    except Exception as e:
+        logging.warning(f"[ASR] Warmup failed: {e}")
+
+
+def _transcribe(model: WhisperModel, audio: np.ndarray, **overrides):
+    # Auto-language support if WHISPER_LANG="auto"
+    lang = LANGUAGE if LANGUAGE != "auto" else None
+    opts = dict(
+        beam_size=BEAM_SIZE,
+        vad_filter=VAD_ENABLED,
+        vad_parameters={"min_silence_duration_ms": 300, "threshold": 0.5},
+        language=lang,
+        task="transcribe",
+        initial_prompt=INITIAL_PROMPT,
+        # conditioning on earlier windows feeds hallucination loops on echoey audio
+        condition_on_previous_text=False,
+        no_speech_threshold=0.35,
+        compression_ratio_threshold=2.3,
+        temperature=0.0,
+    )
+    opts.update(overrides)
+    segments, _info = model.transcribe(audio, **opts)
+    return segments
+
+
+if njit is not None:
+    # explicit signature: compiled at import, never on the realtime audio thread
+    @njit("void(float32[:, :], float32[:])", cache=True, fastmath=True)
+    def _downmix_into(src, dst):
+        # one pass: channel average written straight into dst
+        n, ch = src.shape
+        for i in range(n):
+            acc = 0.0
+            for c in range(ch):
+                acc += src[i, c]
+            dst[i] = acc / ch
+else:
+    _downmix_into = None
+
+
+def _write_mono(src: np.ndarray, dst: np.ndarray):
+    """Downmix src into the ring slice dst without intermediate arrays."""
+    if src.ndim != 2:
+        dst[:] = src
+    elif _downmix_into is not None:
+        _downmix_into(src, dst)
+    else:
+        src.mean(axis=1, out=dst)
+
+
 def _sd_callback(indata, frames, time_info, status):
     if status:
         logging.warning(f"Audio callback status: {status}")
-    try:
-        block = np.asarray(indata, dtype=np.float32)
-        if block.ndim == 2:
-            block = np.mean(block, axis=1, keepdims=True)
-        _audio_q.put_nowait(block.copy())
-    except queue.Full:
-        pass
+    block = np.asarray(indata, dtype=np.float32)
+    n = block.shape[0]
+    t = _tail[0]
+    if t + n - _head[0] > _RING_N:
+        return  # consumer is a full ring behind: drop this block
+
+    pos = t % _RING_N
+    end = pos + n
+    if end <= _RING_N:
+        _write_mono(block, _RING[pos:end])
+    else:
+        k = _RING_N - pos
+        _write_mono(block[:k], _RING[pos:])
+        _write_mono(block[k:], _RING[:end - _RING_N])
+    # publish only after the samples are written
+    _tail[0] = t + n
+
+
+def _ring_wait(count: int) -> bool:
+    """Poll until `count` unread samples are in the ring; False once stopped."""
+    while _tail[0] - _head[0] < count:
+        if _stop_flag.is_set():
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def _ring_read(start: int, count: int) -> np.ndarray:
+    """A view of `count` samples from absolute position `start` (a copy only across the wrap)."""
+    pos = start % _RING_N
+    end = pos + count
+    if end <= _RING_N:
+        return _RING[pos:end]
+    return np.concatenate((_RING[pos:], _RING[:end - _RING_N]))
 
 
 def stop_listener():
-    """Stop the listener safely and clear old audio blocks."""
+    """Stop the listener safely; it discards unread audio as it exits."""
     _stop_flag.set()
     try:
         global _stream
@@ -110,11 +240,6 @@ def stop_listener():
             _stream = None
     except Exception:
         pass
-    while not _audio_q.empty():
-        try:
-            _audio_q.get_nowait()
-        except:
-            break
 
 
 # -------------------------------------------------
@@ -131,7 +256,9 @@ def listen_and_transcribe() -> Generator[str, None, None]:
     sd.default.channels = CHANNELS
 
     target_samples = int(SAMPLE_RATE * BLOCK_SECONDS)
-    buf = np.zeros((0, 1), dtype=np.float32)
+
+    # start from fresh audio
+    _head[0] = _tail[0]
 
     _stream = sd.InputStream(
         samplerate=SAMPLE_RATE,
@@ -143,53 +270,46 @@ def listen_and_transcribe() -> Generator[str, None, None]:
     _stream.start()
 
     try:
-        while not _stop_flag.is_set():
-            try:
-                data = _audio_q.get(timeout=0.5)
-            except queue.Empty:
-                continue
+        if LOCAL_AGREEMENT:
+            yield from _local_agreement_loop(model)
+            return
 
-            if data.ndim == 1:
-                data = data[:, None]
-
-            buf = np.concatenate((buf, data), axis=0)
-
-            if buf.shape[0] < target_samples:
-                continue
+        # hot-loop names bound once as locals
+        ring_wait, ring_read, head = _ring_wait, _ring_read, _head
+        transcribe, ws_sub = _transcribe, _RE_WS.sub
 
-            chunk = buf[:target_samples, 0]
-            buf = buf[target_samples:, :]
+        while ring_wait(target_samples):
+            # a view into the shared ring; the samples are released only after
+            # decoding, so the callback cannot overwrite them meanwhile
+            h = head[0]
+            chunk = ring_read(h, target_samples)
 
             try:
-                # Auto-language support if WHISPER_LANG="auto"
-                lang = LANGUAGE if LANGUAGE != "auto" else None
-
-                segments, _info = model.transcribe(
-                    chunk,
-                    beam_size=3,
-                    vad_filter=VAD_ENABLED,
-                    vad_parameters={"min_silence_duration_ms": 400},
-                    language=lang,
-                    task="transcribe",
-                    initial_prompt=INITIAL_PROMPT,
-                    condition_on_previous_text=True,
-                    no_speech_threshold=0.35,
-                    compression_ratio_threshold=2.3,
-                    temperature=0.0,
-                )
-
-                text = " ".join(s.text.strip() for s in segments if s.text.strip())
-                text = re.sub(r"\s+", " ", text).strip()
-
-                if len(text) >= MIN_CHARS and text != _last_text:
-                    _last_text = text
-                    if VERBOSE_CHUNKS:
-                        logging.info(f"[ASR] {text}")
-                    yield text
-
+                # near-silent block: not worth an encoder pass
+                if RMS_GATE and np.sqrt(float(np.dot(chunk, chunk)) / target_samples) < RMS_GATE:
+                    continue
+
+                # block mode never reads segment times, so skip timestamp tokens
+                segments = transcribe(model, chunk, without_timestamps=True)
+
+                # decoding happens while iterating; each piece is stripped once
+                pieces = []
+                for seg in segments:
+                    t = seg.text.strip()
+                    if t:
+                        pieces.append(t)
+                text = ws_sub(" ", " ".join(pieces)).strip()
             except Exception as e:
                 logging.error(f"[ASR] Error: {e}")
                 continue
+            finally:
+                head[0] = h + target_samples
+
+            if len(text) >= MIN_CHARS and text != _last_text:
+                _last_text = text
+                if VERBOSE_CHUNKS:
+                    logging.info(f"[ASR] {text}")
+                yield text
     finally:
         try:
             _stream.stop()
@@ -197,6 +317,79 @@ def listen_and_transcribe() -> Generator[str, None, None]:
         except Exception:
             pass
         _stream = None
+        # drop unread audio; only this (consumer) thread ever writes _head
+        _head[0] = _tail[0]
+
+
+def _local_agreement_loop(model: WhisperModel) -> Generator[str, None, None]:
+    """
+    LocalAgreement-2 over a rolling buffer (up to MAX_BUFFER_SECONDS).
+    Every MIN_CHUNK_SECONDS of new audio the buffer is re-transcribed with
+    word timestamps; the longest common prefix with the previous pass is
+    committed, and the audio before the last committed word is trimmed.
+    """
+    global _last_text
+    max_samples = int(SAMPLE_RATE * MAX_BUFFER_SECONDS)
+    min_chunk = int(SAMPLE_RATE * MIN_CHUNK_SECONDS)
+
+    audio = np.empty(max_samples, dtype=np.float32)
+    n = 0                 # valid samples in audio
+    offset = 0.0          # stream time (s) of audio[0]
+    committed_t = 0.0     # stream time (s) where the last committed word ends
+    prev: list = []       # previous pass's uncommitted (start, end, word)
+    pending = ""          # committed text shorter than MIN_CHARS, held back
+
+    def _trim(cut: int):
+        nonlocal n, offset
+        audio[:n - cut] = audio[cut:n]
+        n -= cut
+        offset += cut / SAMPLE_RATE
+
+    while _ring_wait(min_chunk):
+        h = _head[0]
+        k = _tail[0] - h
+        data = _ring_read(h, k)[-max_samples:]
+        if n + data.shape[0] > max_samples:
+            # buffer cap: drop the oldest audio even if nothing was committed
+            _trim(n + data.shape[0] - max_samples)
+        audio[n:n + data.shape[0]] = data
+        n += data.shape[0]
+        _head[0] = h + k
+
+        try:
+            segments = _transcribe(model, audio[:n], word_timestamps=True)
+            words = [
+                (offset + w.start, offset + w.end, w.word.strip())
+                for seg in segments for w in (seg.words or [])
+                if w.word.strip() and offset + (w.start + w.end) / 2 > committed_t
+            ]
+        except Exception as e:
+            logging.error(f"[ASR] Error: {e}")
+            continue
+
+        agreed = 0
+        for (_s, _e, w), (_ps, _pe, pw) in zip(words, prev):
+            if w.lower() != pw.lower():
+                break
+            agreed += 1
+        prev = words[agreed:]
+        if not agreed:
+            continue
+
+        committed_t = words[agreed - 1][1]
+        cut = int((committed_t - 0.2 - offset) * SAMPLE_RATE)
+        if cut > 0:
+            _trim(min(cut, n))
+
+        text = (pending + " " + " ".join(w for _s, _e, w in words[:agreed])).strip()
+        if len(text) < MIN_CHARS:
+            pending = text
+            continue
+        pending = ""
+        _last_text = text
+        if VERBOSE_CHUNKS:
+            logging.info(f"[ASR] {text}")
+        yield text
 
 
 # -------------------------------------------------
@@ -213,3 +406,7 @@ def start_listener(callback):
     th = threading.Thread(target=_run, daemon=True)
     th.start()
     return th
+
+
+if WARMUP:
+    threading.Thread(target=_warmup, daemon=True).start()
@@ -11,7 +11,6 @@ import os
 import queue
 import torch
 import soundfile as sf
-import time
 
 # ---------------- CONFIG ----------------
 SAMPLE_RATE = 16000
@@ -42,8 +41,7 @@ def transcribe_chunk(audio_chunk):
         # Write chunk to file
         sf.write(wav_path, audio_chunk, SAMPLE_RATE)
 
-        # Force file to flush & ensure it's readable
-        time.sleep(0.2)
+        # sf.write closes the file before returning; just sanity-check it
         if not os.path.exists(wav_path) or os.path.getsize(wav_path) == 0:
             print("⚠️ Temp WAV file not ready yet.")
             return
@@ -16,6 +16,9 @@ import logging
 import json
 import os
 import re
+import hashlib
+import threading
+from collections import OrderedDict
 import requests
 from dotenv import load_dotenv
 
@@ -31,6 +34,7 @@ TRANSLATION_PROVIDER = os.getenv("TRANSLATION_PROVIDER", "marian")  # "marian" o
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash-lite")  # Updated to Gemini 2.5 Flash Lite
 GEMINI_BATCH_SIZE = int(os.getenv("GEMINI_BATCH_SIZE", "10"))  # Translate up to 10 segments per API call
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "4096"))  # 0 disables the cache
 
 # -------------------------------------------------------------------
 # Marian Model setup (lazy loading)
@@ -61,6 +65,37 @@ else:
     GLOSSARY = {}
 
 
+# -------------------------------------------------------------------
+# Translation cache (content-addressed, in-process LRU)
+# -------------------------------------------------------------------
+_translation_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+_translation_cache_lock = threading.Lock()
+
+
+def _cache_key(provider: str, text: str) -> tuple:
+    return provider, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _cache_get(key: tuple):
+    with _translation_cache_lock:
+        hit = _translation_cache.get(key)
+        if hit is not None:
+            _translation_cache.move_to_end(key)
+            return dict(hit)
+    return None
+
+
+def _cache_put(key: tuple, result: Dict):
+    # Failed translations carry confidence 0.0; never pin those in the cache
+    if TRANSLATION_CACHE_SIZE <= 0 or not result.get("confidence"):
+        return
+    with _translation_cache_lock:
+        _translation_cache[key] = dict(result)
+        _translation_cache.move_to_end(key)
+        while len(_translation_cache) > TRANSLATION_CACHE_SIZE:
+            _translation_cache.popitem(last=False)
+
+
 # -------------------------------------------------------------------
 # Gemini API Translation (Batch-Optimized)
 # -------------------------------------------------------------------
@@ -332,7 +367,7 @@ def translate_with_marian(malay_sentences: List[str]) -> List[Dict[str, str]]:
     return results
 
 
-def translate_text_batch(malay_sentences: List[str], provider: str = None) -> List[Dict[str, str]]:
+def translate_text_batch(malay_sentences: List[str], provider: str = None, use_cache: bool = True) -> List[Dict[str, str]]:
     """
     Translate Malay sentences to English.
     
@@ -340,6 +375,8 @@ def translate_text_batch(malay_sentences: List[str], provider: str = None) -> Li
         malay_sentences: List of Malay text strings
         provider: Translation provider ("marian" or "gemini"). 
                   If None, uses TRANSLATION_PROVIDER env var.
+        use_cache: If False, skip cache lookups (explicit retranslation);
+                   fresh results still replace the cached entries.
     
     Returns [{"text": translated_text, "confidence": float}, ...]
     """
@@ -347,12 +384,30 @@ def translate_text_batch(malay_sentences: List[str], provider: str = None) -> Li
         return []
     
     # Determine provider
-    use_provider = provider or TRANSLATION_PROVIDER
-    
-    if use_provider.lower() == "gemini":
-        if not GEMINI_API_KEY:
-            logger.warning("Gemini API key not set, falling back to Marian")
-            return translate_with_marian(malay_sentences)
-        return translate_with_gemini(malay_sentences)
-    else:
-        return translate_with_marian(malay_sentences)
+    use_provider = (provider or TRANSLATION_PROVIDER).lower()
+    if use_provider == "gemini" and not GEMINI_API_KEY:
+        logger.warning("Gemini API key not set, falling back to Marian")
+        use_provider = "marian"
+    translate = translate_with_gemini if use_provider == "gemini" else translate_with_marian
+
+    # Serve repeated inputs from the cache; only unique misses reach the model
+    keys = [_cache_key(use_provider, s) for s in malay_sentences]
+    results = [_cache_get(k) for k in keys] if use_cache else [None] * len(keys)
+    misses: Dict[tuple, str] = {}
+    for k, s, r in zip(keys, malay_sentences, results):
+        if r is None and k not in misses:
+            misses[k] = s
+
+    if misses:
+        translated = translate(list(misses.values()))
+        if len(translated) != len(misses):
+            logger.warning(f"Provider returned {len(translated)} results for {len(misses)} inputs.")
+        fetched = {}
+        for i, k in enumerate(misses):
+            r = translated[i] if i < len(translated) else {"text": "[Translation missing]", "confidence": 0.0}
+            fetched[k] = r
+            _cache_put(k, r)
+        results = [r if r is not None else dict(fetched[k]) for k, r in zip(keys, results)]
+        logger.info(f"Translation cache: {len(malay_sentences) - len(misses)} hits, {len(misses)} misses.")
+
+    return results